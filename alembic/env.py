@@ -3,12 +3,17 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from app.account import models as account_models
+from app.buy import models as buy_models
+from app.sell import models as sell_models
 from alembic import context
 
-from app.database import Base
+from app.database import SQLALCHEMY_DATABASE_URL, Base
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# migrate the database the app uses (DATABASE_URL), not a URL fixed in alembic.ini;
+# "%" is escaped for the ini-style interpolation
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -21,6 +26,16 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # SQLite FTS5 search index (tasks_fts and its shadow tables) is created by
+    # raw DDL, not the models; don't let autogenerate drop it
+    if type_ == "table" and reflected and (name == "tasks_fts" or name.startswith("tasks_fts_")):
+        return False
+    # the FULLTEXT index only exists on MySQL (ddl_if in the model)
+    if type_ == "index" and name == "ft_tasks_title_description" and context.get_context().dialect.name != "mysql":
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,6 +60,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -66,7 +82,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
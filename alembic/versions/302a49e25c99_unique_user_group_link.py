@@ -0,0 +1,38 @@
+"""unique user group link
+
+Revision ID: 302a49e25c99
+Revises: f91e7842db34
+Create Date: 2026-10-18 12:20:53.904716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '302a49e25c99'
+down_revision: Union[str, Sequence[str], None] = 'f91e7842db34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the unique index can't be built over duplicate links: keep one copy of each
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT 1 FROM user_group_link GROUP BY user_id, group_id HAVING COUNT(*) > 1 LIMIT 1"
+    )).first()
+    if duplicates is not None:
+        op.execute("CREATE TABLE user_group_link_dedup AS SELECT DISTINCT user_id, group_id FROM user_group_link")
+        op.execute("DELETE FROM user_group_link")
+        op.execute("INSERT INTO user_group_link (user_id, group_id) SELECT user_id, group_id FROM user_group_link_dedup")
+        op.execute("DROP TABLE user_group_link_dedup")
+    op.create_index('ux_user_group_link_user_group', 'user_group_link', ['user_id', 'group_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_user_group_link_user_group', table_name='user_group_link')
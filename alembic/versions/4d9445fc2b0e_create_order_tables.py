@@ -0,0 +1,79 @@
+"""create order tables
+
+Revision ID: 4d9445fc2b0e
+Revises: 302a49e25c99
+Create Date: 2026-10-18 14:05:37.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9445fc2b0e'
+down_revision: Union[str, Sequence[str], None] = '302a49e25c99'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('buy_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item', sa.String(length=50), nullable=False),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('filled', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_buy_orders_item_status', 'buy_orders', ['item', 'status'], unique=False)
+    op.create_index(op.f('ix_buy_orders_user_id'), 'buy_orders', ['user_id'], unique=False)
+    op.create_table('sell_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item', sa.String(length=50), nullable=False),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('filled', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sell_orders_item_status', 'sell_orders', ['item', 'status'], unique=False)
+    op.create_index(op.f('ix_sell_orders_user_id'), 'sell_orders', ['user_id'], unique=False)
+    op.create_table('trades',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item', sa.String(length=50), nullable=False),
+    sa.Column('buy_order_id', sa.Integer(), nullable=False),
+    sa.Column('sell_order_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['buy_order_id'], ['buy_orders.id'], ),
+    sa.ForeignKeyConstraint(['sell_order_id'], ['sell_orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trades_buy_order_id'), 'trades', ['buy_order_id'], unique=False)
+    op.create_index(op.f('ix_trades_item'), 'trades', ['item'], unique=False)
+    op.create_index(op.f('ix_trades_sell_order_id'), 'trades', ['sell_order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trades_sell_order_id'), table_name='trades')
+    op.drop_index(op.f('ix_trades_item'), table_name='trades')
+    op.drop_index(op.f('ix_trades_buy_order_id'), table_name='trades')
+    op.drop_table('trades')
+    op.drop_index(op.f('ix_sell_orders_user_id'), table_name='sell_orders')
+    op.drop_index('ix_sell_orders_item_status', table_name='sell_orders')
+    op.drop_table('sell_orders')
+    op.drop_index(op.f('ix_buy_orders_user_id'), table_name='buy_orders')
+    op.drop_index('ix_buy_orders_item_status', table_name='buy_orders')
+    op.drop_table('buy_orders')
@@ -0,0 +1,30 @@
+"""add task pagination indexes
+
+Revision ID: 6c834e52a8af
+Revises: c2d27d45bc07
+Create Date: 2026-10-18 10:12:41.308215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c834e52a8af'
+down_revision: Union[str, Sequence[str], None] = 'c2d27d45bc07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_assigned_group_id_id', 'tasks', ['assigned_group_id', 'id'], unique=False)
+    op.create_index('ix_tasks_status_id', 'tasks', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_status_id', table_name='tasks')
+    op.drop_index('ix_tasks_assigned_group_id_id', table_name='tasks')
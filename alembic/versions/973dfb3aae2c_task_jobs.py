@@ -0,0 +1,43 @@
+"""task jobs
+
+Revision ID: 973dfb3aae2c
+Revises: 34cae946afca
+Create Date: 2026-10-18 15:47:21.930417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '973dfb3aae2c'
+down_revision: Union[str, Sequence[str], None] = '34cae946afca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_jobs_status_id', 'task_jobs', ['status', 'id'], unique=False)
+    op.create_index(op.f('ix_task_jobs_task_id'), 'task_jobs', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_jobs_task_id'), table_name='task_jobs')
+    op.drop_index('ix_task_jobs_status_id', table_name='task_jobs')
+    op.drop_table('task_jobs')
@@ -0,0 +1,96 @@
+# AsyncSession versions of the hot account routes, mounted ahead of the sync
+# router when DB_ASYNC=1. Routes not defined here fall through to router.py.
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_async_db
+from app.account import crud, models, schemas
+from app.account.permissions import permission_index
+from app.account.principal import Principal, async_effective_mask, async_load_principal
+from app.account.ratelimit import login_throttle, register_throttle
+from app.account.revocation import revocation_store
+from app.account.router import (
+    check_permissions,
+    oauth2_scheme,
+    render_tasks_page,
+    task_page_params,
+    tasks_cache_key,
+    tasks_response,
+    token_subject,
+)
+from app.core.response_cache import response_cache
+from app.core.hashing import HashingBusy
+from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+
+router = APIRouter()
+
+# -----------------------
+# Dependencies
+# -----------------------
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    if revocation_store.blocking:
+        username = await run_in_threadpool(token_subject, token)
+    else:
+        username = token_subject(token)
+    principal = await async_load_principal(db, username)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return principal
+
+def permission_required(*permission_names: str):
+    required = permission_index.mask(permission_names)
+
+    async def dependency(
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        check_permissions(await async_effective_mask(db, current_user), required)
+        return current_user
+    return dependency
+
+# -----------------------
+# Auth Routes
+# -----------------------
+@router.post("/register", response_model=schemas.UserResponse, dependencies=[Depends(register_throttle)])
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await crud.async_get_user_by_username(db, user.username):
+        raise HTTPException(status_code=400, detail="Username already exists")
+    try:
+        return await crud.async_create_user(db, user)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_throttle)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    try:
+        user = await crud.async_authenticate_user(db, form_data.username, form_data.password)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    access_token = create_access_token(
+        data={"sub": user.username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# -----------------------
+# Task Routes
+# -----------------------
+@router.get("/tasks", response_model=list[schemas.TaskResponse])
+async def list_tasks(
+    request: Request,
+    page: dict = Depends(task_page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(permission_required("view_task")),
+):
+    key = tasks_cache_key(page, current_user)
+    entry = response_cache.get(key)
+    if entry is None:
+        rows, next_cursor = await crud.async_list_tasks_page(db, **page)
+        entry = render_tasks_page(key, rows, next_cursor)
+    return tasks_response(request, entry)
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import os
+from typing import Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import InsertmanyvaluesSentinelOpts
+
+from app.account import models, schemas
+from app.account.crud import TASK_RESPONSE_COLUMNS
+from app.account.feed import publish_tasks
+from app.account.jobs import task_queue
+from app.account.search import index_tasks
+from app.core.hashing import PasswordHasher, bulk_password_hasher
+from app.core.response_cache import response_cache
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_TASK_CHUNK_SIZE = int(os.getenv("BULK_TASK_CHUNK_SIZE", "1000"))
+BULK_TASK_MAX_ITEMS = int(os.getenv("BULK_TASK_MAX_ITEMS", "10000"))
+# keep IN (...) lists under driver/SQLite bound-parameter limits
+_IN_CHUNK = 5000
+
+# -----------------------
+# Parsing
+# -----------------------
+def parse_rows(stream: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row_number, dict) pairs; undecodable NDJSON lines yield (row_number, error_message)."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, row
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield number, f"Invalid JSON: {exc.msg}"
+
+def detect_format(filename: str) -> str:
+    return "csv" if (filename or "").lower().endswith(".csv") else "ndjson"
+
+# -----------------------
+# Import
+# -----------------------
+def _existing_identities(db: Session, usernames, emails):
+    taken_usernames, taken_emails = set(), set()
+    usernames, emails = list(usernames), list(emails)
+    for start in range(0, max(len(usernames), len(emails)), _IN_CHUNK):
+        rows = db.execute(
+            select(models.User.username, models.User.email).where(or_(
+                models.User.username.in_(usernames[start:start + _IN_CHUNK]),
+                models.User.email.in_(emails[start:start + _IN_CHUNK]),
+            ))
+        )
+        for username, email in rows:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+    return taken_usernames, taken_emails
+
+def _insert_chunk(db: Session, chunk, errors):
+    try:
+        db.execute(insert(models.User), [values for _, values in chunk])
+        db.commit()
+        return len(chunk)
+    except IntegrityError:
+        db.rollback()
+    # someone else inserted a conflicting user meanwhile: retry row by row to find it
+    created = 0
+    for number, values in chunk:
+        try:
+            db.execute(insert(models.User), [values])
+            db.commit()
+            created += 1
+        except IntegrityError:
+            db.rollback()
+            errors.append({"row": number, "error": "Username or email already exists"})
+    return created
+
+def import_users(
+    db: Session,
+    rows: Iterable[Tuple[int, object]],
+    chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+    hasher: PasswordHasher = bulk_password_hasher,
+) -> dict:
+    """Validate, de-duplicate, hash and insert users; returns counts and per-row errors.
+
+    Existing usernames/emails are looked up in one query, passwords are hashed
+    in parallel on a process pool, and rows are written with executemany
+    inserts, one transaction per `chunk_size` rows.
+    """
+    errors = []
+    accepted = []  # (row_number, UserCreate)
+    seen_usernames, seen_emails = set(), set()
+    for number, data in rows:
+        if isinstance(data, str):
+            errors.append({"row": number, "error": data})
+            continue
+        try:
+            user = schemas.UserCreate.model_validate(data)
+        except ValidationError as exc:
+            errors.append({"row": number, "error": "; ".join(
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()
+            )})
+            continue
+        if user.username in seen_usernames or user.email in seen_emails:
+            errors.append({"row": number, "error": "Duplicate username or email in file"})
+            continue
+        seen_usernames.add(user.username)
+        seen_emails.add(user.email)
+        accepted.append((number, user))
+
+    taken_usernames, taken_emails = _existing_identities(db, seen_usernames, seen_emails)
+    new_users = []
+    for number, user in accepted:
+        if user.username in taken_usernames or user.email in taken_emails:
+            errors.append({"row": number, "error": "Username or email already exists"})
+        else:
+            new_users.append((number, user))
+
+    db.rollback()  # release the connection while passwords are hashed
+    hashed = hasher.hash_many([user.password for _, user in new_users])
+    created = 0
+    for start in range(0, len(new_users), chunk_size):
+        chunk = [
+            (number, {
+                "username": user.username,
+                "email": user.email,
+                "password": password,
+                "birthdate": user.birthdate,
+                "role": models.UserRole.user,
+                "is_active": True,
+            })
+            for (number, user), password in zip(new_users[start:start + chunk_size], hashed[start:start + chunk_size])
+        ]
+        created += _insert_chunk(db, chunk, errors)
+
+    errors.sort(key=lambda e: e["row"])
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+# -----------------------
+# Bulk task create / update
+# -----------------------
+# One IN query validates every referenced group, and each chunk of
+# BULK_TASK_CHUNK_SIZE items is written with executemany statements in its
+# own transaction, so the statement count doesn't grow with the chunk.
+# A chunk that fails is retried item by item so one bad row doesn't fail its
+# neighbours. Core writes bypass the ORM session hooks, so each committed
+# chunk refreshes the task caches, search index and change feed itself.
+def _existing_ids(db: Session, column, ids) -> set:
+    ids, found = list(ids), set()
+    for start in range(0, len(ids), _IN_CHUNK):
+        found.update(db.execute(select(column).where(column.in_(ids[start:start + _IN_CHUNK]))).scalars())
+    return found
+
+def _write_chunks(db: Session, items, write, chunk_size: int, results: dict):
+    """items: (index, values) pairs; write(db, values_list) returns the written
+    tasks (TaskResponse field dicts, None for a row that no longer exists) in the
+    same order. Yields each committed chunk's tasks."""
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        try:
+            tasks = write(db, [values for _, values in chunk])
+            db.commit()
+            written = list(zip(chunk, tasks))
+        except IntegrityError:
+            db.rollback()
+            written = []
+            for index, values in chunk:
+                try:
+                    tasks = write(db, [values])
+                    db.commit()
+                    written.append(((index, values), tasks[0]))
+                except IntegrityError:
+                    db.rollback()
+                    results[index] = {"index": index, "error": "Rejected by the database (constraint violation)"}
+        for (index, _), task in written:
+            results[index] = {"index": index, "id": task["id"]} if task else {"index": index, "error": "Task not found"}
+        yield [task for _, task in written if task]
+
+def _insert_ids(connection, table, rows) -> list:
+    """Insert rows and return their new ids in row order, in as few statements as the dialect allows."""
+    dialect = connection.dialect
+    if (dialect.insert_executemany_returning_sort_by_parameter_order
+            and dialect.insertmanyvalues_implicit_sentinel & InsertmanyvaluesSentinelOpts.AUTOINCREMENT):
+        # PostgreSQL, MariaDB: batched INSERT ... RETURNING, ordered by the autoincrement sentinel
+        return connection.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+    if dialect.name == "sqlite":
+        # SQLite has no sentinel, so ordered RETURNING goes row by row. Its new
+        # rowid is max(rowid) + 1 and the first INSERT takes the write lock, so
+        # the rest of the rows get the ids right after the first one's.
+        first = connection.execute(insert(table), rows[0]).lastrowid
+        if len(rows) > 1:
+            connection.execute(insert(table), rows[1:])
+        return list(range(first, first + len(rows)))
+    # MySQL: no RETURNING, and interleaved autoincrement locking doesn't promise
+    # consecutive ids; one INSERT per row, still one transaction per chunk
+    return [connection.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+
+def _insert_tasks(db: Session, rows):
+    connection = db.connection()
+    ids = _insert_ids(connection, models.Task.__table__, rows)
+    tasks = [{**row, "id": task_id} for row, task_id in zip(rows, ids)]
+    if task_queue.enabled:
+        connection.execute(insert(models.TaskJob.__table__), [{"task_id": task["id"]} for task in tasks])
+    return tasks
+
+def tasks_written(event_type: str, tasks):
+    """Side effects the ORM session hooks would have applied, for committed Core task writes."""
+    response_cache.bump("tasks")
+    index_tasks(tasks)
+    publish_tasks(event_type, tasks)
+
+def _ordered_result(results: dict, total: int) -> dict:
+    items = [results[index] for index in range(total)]
+    failed = sum(1 for item in items if item.get("error"))
+    return {"succeeded": total - failed, "failed": failed, "results": items}
+
+def create_tasks(db: Session, tasks: List[schemas.TaskCreate], chunk_size: int = BULK_TASK_CHUNK_SIZE) -> dict:
+    """Insert tasks (and their background jobs); per-item result in request order."""
+    groups = _existing_ids(db, models.Group.id, {t.assigned_group_id for t in tasks if t.assigned_group_id is not None})
+    results, accepted = {}, []
+    for index, task in enumerate(tasks):
+        if task.assigned_group_id is not None and task.assigned_group_id not in groups:
+            results[index] = {"index": index, "error": "Group not found"}
+        else:
+            accepted.append((index, {
+                "title": task.title,
+                "description": task.description,
+                "assigned_group_id": task.assigned_group_id,
+                "status": "pending",
+            }))
+    for written in _write_chunks(db, accepted, _insert_tasks, chunk_size, results):
+        if written:
+            tasks_written("task.created", written)
+            task_queue.notify()
+    return _ordered_result(results, len(tasks))
+
+def _update_tasks(db: Session, rows):
+    # rows: {"id", <only the fields the patch sets>}. Patches that set the same
+    # fields share one executemany, so a field nobody sent is never written.
+    # Core on the table: the ORM can't executemany an UPDATE with a WHERE clause.
+    tasks_table = models.Task.__table__
+    connection = db.connection()
+    by_fields = {}
+    for row in rows:
+        by_fields.setdefault(tuple(sorted(key for key in row if key != "id")), []).append(row)
+    for fields, group in by_fields.items():
+        if not fields:
+            continue
+        connection.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id == bindparam("_id"))
+            .values({field: bindparam("_" + field) for field in fields}),
+            [{"_" + key: value for key, value in row.items()} for row in group],
+        )
+    # read back the committed state for the feed and search index
+    tasks = {task.id: task._asdict() for task in db.execute(
+        select(*TASK_RESPONSE_COLUMNS).where(models.Task.id.in_([row["id"] for row in rows]))
+    )}
+    return [tasks.get(row["id"]) for row in rows]  # None: deleted since it was checked
+
+def update_tasks(db: Session, patches: List[schemas.TaskPatch], chunk_size: int = BULK_TASK_CHUNK_SIZE) -> dict:
+    """Apply partial updates: only the fields sent in each item change."""
+    existing = _existing_ids(db, models.Task.id, {patch.id for patch in patches})
+    groups = _existing_ids(db, models.Group.id, {
+        patch.assigned_group_id for patch in patches if patch.assigned_group_id is not None
+    })
+    db.rollback()  # end the read transaction before the chunked writes
+
+    results, accepted, seen = {}, [], set()
+    for index, patch in enumerate(patches):
+        changes = patch.model_dump(exclude_unset=True, exclude={"id"})
+        if patch.id not in existing:
+            error = "Task not found"
+        elif patch.id in seen:
+            error = "Duplicate task id in request"
+        elif "title" in changes and changes["title"] is None:
+            error = "title may not be null"
+        elif changes.get("assigned_group_id") is not None and changes["assigned_group_id"] not in groups:
+            error = "Group not found"
+        else:
+            error = None
+        if error:
+            results[index] = {"index": index, "error": error}
+            continue
+        seen.add(patch.id)
+        accepted.append((index, {"id": patch.id, **changes}))
+    for written in _write_chunks(db, accepted, _update_tasks, chunk_size, results):
+        if written:
+            tasks_written("task.updated", written)
+    return _ordered_result(results, len(patches))
+
@@ -1,27 +1,155 @@
-from sqlalchemy.orm import Session
+import os
+from typing import Optional
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
 from app.account import models, schemas
-from app.core.security import hash_password, verify_password
+from app.core.hashing import password_hasher
+
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", "50"))
+TASKS_MAX_PAGE_SIZE = int(os.getenv("TASKS_MAX_PAGE_SIZE", "500"))
+
+# -----------------------
+# Loader strategies
+# -----------------------
+# UserResponse nests groups and each GroupResponse lists its members' usernames.
+# selectinload fetches each level with one IN query instead of a lazy load per row.
+USER_WITH_GROUPS = selectinload(models.User.groups).selectinload(models.Group.users).load_only(models.User.username)
+GROUP_WITH_USERS = selectinload(models.Group.users).load_only(models.User.username)
+
+def query_users_with_groups(db: Session):
+    return db.query(models.User).options(USER_WITH_GROUPS)
+
+def query_groups_with_users(db: Session):
+    return db.query(models.Group).options(GROUP_WITH_USERS)
+
+def get_user_with_groups(db: Session, user_id: int):
+    return query_users_with_groups(db).filter(models.User.id == user_id).one_or_none()
+
+def get_group_with_users(db: Session, group_id: int):
+    return query_groups_with_users(db).filter(models.Group.id == group_id).one_or_none()
+
+# -----------------------
+# Task pagination
+# -----------------------
+# Keyset pagination on Task.id: each page is an index range scan starting after
+# the cursor, so cost doesn't grow with page depth the way OFFSET does.
+# TaskResponse's fields, in its field order, so rows serialize exactly like the model
+TASK_RESPONSE_COLUMNS = (
+    models.Task.title,
+    models.Task.description,
+    models.Task.assigned_group_id,
+    models.Task.id,
+    models.Task.status,
+)
+
+def tasks_page_query(after: Optional[int], limit: int, assigned_group_id: Optional[int] = None, status: Optional[str] = None):
+    query = select(*TASK_RESPONSE_COLUMNS)
+    if after is not None:
+        query = query.where(models.Task.id > after)
+    if assigned_group_id is not None:
+        query = query.where(models.Task.assigned_group_id == assigned_group_id)
+    if status is not None:
+        query = query.where(models.Task.status == status)
+    # one extra row tells us whether another page exists
+    return query.order_by(models.Task.id).limit(limit + 1)
+
+def split_page(rows, limit: int):
+    """(items, next_cursor); next_cursor is None on the last page."""
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+def list_tasks_page(db: Session, after: Optional[int], limit: int, **filters):
+    """(rows, next_cursor); rows are plain column tuples, not Task instances."""
+    return split_page(db.execute(tasks_page_query(after, limit, **filters)).all(), limit)
+
+# -----------------------
+# Group membership
+# -----------------------
+def _membership(db: Session, group_id: int, user_ids):
+    """{user_id: is_member} for the ids that exist, in one query on user_group_link."""
+    link = models.user_group_link
+    rows = db.execute(
+        select(models.User.id, link.c.user_id)
+        .outerjoin(link, and_(link.c.user_id == models.User.id, link.c.group_id == group_id))
+        .where(models.User.id.in_(user_ids))
+    )
+    return {user_id: member is not None for user_id, member in rows}
+
+def is_group_member(db: Session, group_id: int, user_id: int) -> bool:
+    link = models.user_group_link
+    return db.execute(
+        select(link.c.user_id).where(link.c.group_id == group_id, link.c.user_id == user_id).limit(1)
+    ).first() is not None
+
+def add_group_members(db: Session, group_id: int, user_ids, attempts: int = 3) -> dict:
+    user_ids = list(dict.fromkeys(user_ids))
+    for attempt in range(attempts):
+        membership = _membership(db, group_id, user_ids)
+        added = [user_id for user_id in user_ids if membership.get(user_id) is False]
+        if not added:
+            break
+        try:
+            db.execute(insert(models.user_group_link), [{"user_id": user_id, "group_id": group_id} for user_id in added])
+            db.commit()
+            break
+        except IntegrityError:
+            # a concurrent request linked one of them first (or deleted a user): re-read and retry
+            db.rollback()
+            if attempt == attempts - 1:
+                raise
+    return {
+        "group_id": group_id,
+        "changed": added,
+        "unchanged": [user_id for user_id in user_ids if membership.get(user_id)],
+        "not_found": [user_id for user_id in user_ids if user_id not in membership],
+    }
+
+def remove_group_members(db: Session, group_id: int, user_ids) -> dict:
+    user_ids = list(dict.fromkeys(user_ids))
+    membership = _membership(db, group_id, user_ids)
+    removed = [user_id for user_id in user_ids if membership.get(user_id)]
+    if removed:
+        link = models.user_group_link
+        db.execute(delete(link).where(link.c.group_id == group_id, link.c.user_id.in_(removed)))
+        db.commit()
+    return {
+        "group_id": group_id,
+        "changed": removed,
+        "unchanged": [user_id for user_id in user_ids if membership.get(user_id) is False],
+        "not_found": [user_id for user_id in user_ids if user_id not in membership],
+    }
 
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_pw = hash_password(user.password)
+# -----------------------
+# AsyncSession versions (DB_ASYNC=1)
+# -----------------------
+async def async_get_user_by_username(db: AsyncSession, username: str):
+    return (await db.scalars(select(models.User).where(models.User.username == username))).first()
+
+async def async_create_user(db: AsyncSession, user: schemas.UserCreate, role: models.UserRole = models.UserRole.user):
     db_user = models.User(
         username=user.username,
         email=user.email,
-        password=hashed_pw,
-        birthdate=user.birthdate
+        password=await password_hasher.hash(user.password),
+        birthdate=user.birthdate,
+        role=role,
+        is_active=True,
+        groups=[],  # a new user has no groups; avoids an async lazy load when serializing
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
-    if not user:
-        return None
-    if not verify_password(password, user.password):
+async def async_authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await async_get_user_by_username(db, username)
+    if not user or not await password_hasher.verify(password, user.password):
         return None
     return user
+
+async def async_list_tasks_page(db: AsyncSession, after: Optional[int], limit: int, **filters):
+    return split_page((await db.execute(tasks_page_query(after, limit, **filters))).all(), limit)
@@ -0,0 +1,71 @@
+import csv
+import enum
+import io
+import os
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.account import models
+from app.core.serialization import dumps
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+TASK_COLUMNS = (
+    models.Task.id,
+    models.Task.title,
+    models.Task.description,
+    models.Task.assigned_group_id,
+    models.Task.status,
+)
+
+# never export password hashes
+USER_COLUMNS = (
+    models.User.id,
+    models.User.username,
+    models.User.email,
+    models.User.birthdate,
+    models.User.role,
+    models.User.is_active,
+)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def stream_rows(session_factory: sessionmaker, columns, fmt: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield an export of `columns` one batch of rows at a time.
+
+    Selects plain columns (no ORM identity map) through a server-side cursor,
+    so memory stays at one batch however many rows the table has. Opens its
+    own session because the body is produced after the request's get_db
+    session may already be closed.
+    """
+    names = [column.key for column in columns]
+    db = session_factory()
+    try:
+        result = db.execute(select(*columns).order_by(columns[0]).execution_options(yield_per=batch_size))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for batch in result.partitions():
+                writer.writerows([_plain(v) for v in row] for row in batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for batch in result.partitions():
+                yield b"".join(
+                    dumps(dict(zip(names, map(_plain, row)))) + b"\n" for row in batch
+                )
+    finally:
+        db.close()
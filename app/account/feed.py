@@ -0,0 +1,88 @@
+import os
+from itertools import chain
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.account import models
+from app.account.principal import Principal
+from app.core.pubsub import HEARTBEAT, RESET, Broker
+from app.core.serialization import dumps
+
+TASK_FEED_BUFFER = int(os.getenv("TASK_FEED_BUFFER", "1000"))
+TASK_FEED_SUBSCRIBER_BUFFER = int(os.getenv("TASK_FEED_SUBSCRIBER_BUFFER", "100"))
+TASK_FEED_HEARTBEAT = float(os.getenv("TASK_FEED_HEARTBEAT", "15"))
+
+# events: task.created / task.updated carry the TaskResponse fields,
+# task.status carries {id, status}. The topic is the task's assigned group.
+task_feed = Broker(buffer_size=TASK_FEED_BUFFER, subscriber_buffer=TASK_FEED_SUBSCRIBER_BUFFER)
+
+def _task_data(task: models.Task) -> dict:
+    return {
+        "title": task.title,
+        "description": task.description,
+        "assigned_group_id": task.assigned_group_id,
+        "id": task.id,
+        "status": task.status,
+    }
+
+def publish_tasks(type: str, tasks):
+    """tasks: TaskResponse field dicts written outside the ORM (bulk endpoints)."""
+    for data in tasks:
+        task_feed.publish(type, data, topic=data["assigned_group_id"])
+
+def publish_status(tasks, status: str):
+    """tasks: (task_id, assigned_group_id) pairs whose status changed outside the ORM."""
+    for task_id, group_id in tasks:
+        task_feed.publish("task.status", {"id": task_id, "status": status}, topic=group_id)
+
+# -----------------------
+# Subscriber filter
+# -----------------------
+# Superadmins see every task; everyone else sees their groups' tasks and
+# unassigned ones. Groups are read once, when the stream opens.
+def task_filter(db: Session, principal: Principal):
+    if principal.role == models.UserRole.superadmin:
+        return lambda event: True
+    group_ids = set(db.execute(
+        select(models.user_group_link.c.group_id).where(models.user_group_link.c.user_id == principal.id)
+    ).scalars())
+    return lambda event: event.topic is None or event.topic in group_ids
+
+# -----------------------
+# SSE framing
+# -----------------------
+async def sse_stream(accept, last_event_id=None):
+    async for item in task_feed.stream(accept, task_feed.parse_id(last_event_id), TASK_FEED_HEARTBEAT):
+        if item is HEARTBEAT:
+            yield b": keep-alive\n\n"
+        elif item is RESET:
+            # events were missed (buffer overrun or restart): refetch GET /tasks, then keep reading
+            yield b"event: reset\ndata: {}\n\n"
+        else:
+            yield (
+                f"id: {task_feed.event_id(item)}\nevent: {item.type}\ndata: ".encode()
+                + dumps(item.data) + b"\n\n"
+            )
+
+# -----------------------
+# Publish ORM task writes after commit
+# -----------------------
+# Values are captured at flush time because commit expires the instances.
+def _collect_tasks(session, flush_context):
+    events = None
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, models.Task):
+            events = events if events is not None else session.info.setdefault("task_feed_events", [])
+            events.append(("task.created" if obj in session.new else "task.updated", _task_data(obj)))
+
+def _publish_tasks(session):
+    for type, data in session.info.pop("task_feed_events", ()):
+        publish_tasks(type, [data])
+
+def _discard_tasks(session):
+    session.info.pop("task_feed_events", None)
+
+event.listen(Session, "after_flush", _collect_tasks)
+event.listen(Session, "after_commit", _publish_tasks)
+event.listen(Session, "after_rollback", _discard_tasks)
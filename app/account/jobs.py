@@ -0,0 +1,374 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, event, func, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.account import models
+from app.account.feed import publish_status
+from app.core.response_cache import response_cache
+from app.database import PrimarySessionLocal
+
+logger = logging.getLogger(__name__)
+
+# TASK_WORKERS=0 leaves jobs queued (e.g. when a separate process runs them)
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "100"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_FLUSH_INTERVAL = float(os.getenv("JOB_FLUSH_INTERVAL", "0.2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# a running job whose worker died is claimed again after this long
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_DEPTH_INTERVAL = float(os.getenv("JOB_DEPTH_INTERVAL", "5.0"))
+# a batch of outcomes that fails to save this many times is written row by row
+JOB_WRITE_ATTEMPTS = int(os.getenv("JOB_WRITE_ATTEMPTS", "5"))
+# "module:function" run for every new task; empty disables the queue (no jobs are enqueued)
+TASK_JOB_HANDLER = os.getenv("TASK_JOB_HANDLER", "app.account.jobs:complete_task")
+
+Job = namedtuple("Job", "id task_id attempts created_at group_id")
+
+async def complete_task(job: Job):
+    """Default handler: a new task needs no work beyond its status transition,
+    so the flusher moves it pending -> processing -> done."""
+    return None
+
+def load_handler(spec: str):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+# -----------------------
+# Job queue
+# -----------------------
+class TaskJobQueue:
+    """Durable queue on the task_jobs table, drained by asyncio workers.
+
+    create_task inserts a task_jobs row in the same transaction as the task,
+    so no job is lost if the process dies. A dispatcher claims queued rows in
+    batches (SELECT ... FOR UPDATE SKIP LOCKED, then one UPDATE), hands them
+    to `workers` coroutines through a bounded asyncio.Queue, and a flusher
+    writes the outcomes back in batches. Task.status moves
+    pending -> processing -> done | failed.
+
+    `handler` is the work a new task triggers: `async def handler(job)`;
+    raising marks the attempt failed, retried until JOB_MAX_ATTEMPTS. Set it
+    (app.main registers TASK_JOB_HANDLER) before startup. Without one the
+    queue is disabled: create_task enqueues nothing and no worker starts.
+    """
+
+    def __init__(self, session_factory=PrimarySessionLocal, workers: int = TASK_WORKERS,
+                 batch_size: int = JOB_BATCH_SIZE, handler=None):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.handler = handler
+        self._loop = None
+        self._coroutines = []
+        self._results = []  # (job, error, failed writes)
+        self._queued = 0
+        self._depth_checked = 0.0
+        self._counters = {"processed": 0, "failed": 0, "retried": 0, "in_flight": 0}
+        self._wait = [0, 0.0, 0.0]  # count, sum, max seconds queued before a worker started
+        self._run = [0, 0.0, 0.0]   # count, sum, max seconds in the handler
+
+    @property
+    def enabled(self) -> bool:
+        """Whether new tasks get a job (a handler is registered; the workers may
+        run in another process when TASK_WORKERS=0)."""
+        return self.handler is not None
+
+    # -----------------------
+    # Lifecycle (called from the app lifespan)
+    # -----------------------
+    async def start(self):
+        if self.workers <= 0 or self._coroutines:
+            return
+        if self.handler is None:
+            logger.info("No task job handler registered; the task job queue is disabled")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._jobs = asyncio.Queue(maxsize=self.batch_size)
+        self._coroutines = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._flush_loop()),
+            *(asyncio.create_task(self._work()) for _ in range(self.workers)),
+        ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop claiming, let in-flight jobs finish, write their outcomes and put
+        claimed jobs no worker started back in the queue. Anything still running
+        after `timeout` is claimed again once its lease expires."""
+        if not self._coroutines:
+            return
+        dispatcher, flusher, *workers = self._coroutines
+        dispatcher.cancel()
+        in_flight = asyncio.ensure_future(self._wait_in_flight())
+        await asyncio.wait([in_flight], timeout=timeout)
+        in_flight.cancel()
+        for coroutine in (flusher, *workers):
+            coroutine.cancel()
+        await asyncio.gather(*self._coroutines, return_exceptions=True)
+        unstarted = []
+        while not self._jobs.empty():
+            unstarted.append(self._jobs.get_nowait())
+        self._coroutines = []
+        self._loop = None
+        await self._flush()
+        if unstarted:
+            await run_in_threadpool(self._release, unstarted)
+
+    async def _wait_in_flight(self):
+        while self._counters["in_flight"]:
+            await asyncio.sleep(0.05)
+
+    def notify(self):
+        """Wake the dispatcher now instead of at the next poll. Safe from any thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    # -----------------------
+    # Dispatcher: claim queued jobs in batches
+    # -----------------------
+    async def _dispatch(self):
+        while True:
+            try:
+                jobs = await run_in_threadpool(self._claim, self.batch_size)
+            except Exception:
+                logger.exception("Claiming task jobs failed")
+                jobs = []
+            for job in jobs:
+                await self._jobs.put(job)  # blocks while the workers are saturated
+            if len(jobs) < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _claim(self, limit: int):
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            if time.monotonic() - self._depth_checked >= JOB_DEPTH_INTERVAL:
+                self._reclaim_expired(db, now)
+            rows = db.execute(
+                select(models.TaskJob.id, models.TaskJob.task_id, models.TaskJob.attempts, models.TaskJob.created_at,
+                       models.Task.assigned_group_id)
+                .join(models.Task, models.Task.id == models.TaskJob.task_id)
+                .where(models.TaskJob.status == "queued")
+                .order_by(models.TaskJob.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                db.rollback()
+                return []
+            db.execute(
+                update(models.TaskJob)
+                .where(models.TaskJob.id.in_([row.id for row in rows]))
+                .values(status="running", started_at=now, attempts=models.TaskJob.attempts + 1)
+            )
+            db.execute(
+                update(models.Task)
+                .where(models.Task.id.in_([row.task_id for row in rows]))
+                .values(status="processing")
+            )
+            db.commit()
+        finally:
+            db.close()
+        # Core updates skip the ORM hooks that invalidate cached task pages
+        response_cache.bump("tasks")
+        jobs = [Job(row.id, row.task_id, row.attempts + 1, row.created_at, row.assigned_group_id) for row in rows]
+        publish_status(((job.task_id, job.group_id) for job in jobs), "processing")
+        return jobs
+
+    def _reclaim_expired(self, db: Session, now: datetime):
+        db.execute(
+            update(models.TaskJob)
+            .where(models.TaskJob.status == "running",
+                   models.TaskJob.started_at < now - timedelta(seconds=JOB_LEASE_SECONDS))
+            .values(status="queued")
+        )
+        self._queued = db.execute(
+            select(func.count()).select_from(models.TaskJob).where(models.TaskJob.status == "queued")
+        ).scalar_one()
+        db.commit()
+        self._depth_checked = time.monotonic()
+
+    def _release(self, jobs):
+        # claimed but never handed to a worker: back to the queue without counting an attempt
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(models.TaskJob)
+                .where(models.TaskJob.id.in_([job.id for job in jobs]))
+                .values(status="queued", attempts=models.TaskJob.attempts - 1)
+            )
+            db.execute(
+                update(models.Task)
+                .where(models.Task.id.in_([job.task_id for job in jobs]))
+                .values(status="pending")
+            )
+            db.commit()
+        finally:
+            db.close()
+        response_cache.bump("tasks")
+        publish_status(((job.task_id, job.group_id) for job in jobs), "pending")
+
+    # -----------------------
+    # Workers
+    # -----------------------
+    async def _work(self):
+        while True:
+            job = await self._jobs.get()
+            self._counters["in_flight"] += 1
+            started = time.monotonic()
+            _observe(self._wait, max(0.0, (datetime.utcnow() - job.created_at).total_seconds()))
+            error = None
+            try:
+                await self.handler(job)
+            except Exception as exc:
+                logger.exception("Task job %s (task %s) failed", job.id, job.task_id)
+                error = f"{type(exc).__name__}: {exc}"[:500]
+            _observe(self._run, time.monotonic() - started)
+            self._results.append((job, error, 0))
+            self._counters["in_flight"] -= 1
+            if len(self._results) >= self.batch_size:
+                self._flush_now.set()
+
+    # -----------------------
+    # Flusher: batched outcome writes
+    # -----------------------
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), JOB_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self._flush()
+
+    async def _flush(self):
+        results, self._results = self._results, []
+        if not results:
+            return
+        try:
+            await run_in_threadpool(self._write_results, results)
+            return
+        except Exception:
+            logger.exception("Writing %d task job results failed", len(results))
+        results = [(job, error, writes + 1) for job, error, writes in results]
+        retry = [result for result in results if result[2] < JOB_WRITE_ATTEMPTS]
+        self._results[:0] = retry
+        if len(retry) < len(results):
+            await run_in_threadpool(self._write_one_by_one, [r for r in results if r[2] >= JOB_WRITE_ATTEMPTS])
+
+    def _write_one_by_one(self, results):
+        # isolate the outcome that can't be saved; its job stays "running" and
+        # is claimed again once its lease expires
+        for result in results:
+            try:
+                self._write_results([result])
+            except Exception:
+                logger.exception("Dropping the outcome of task job %s; it reruns after its lease", result[0].id)
+
+    def _write_results(self, results):
+        now = datetime.utcnow()
+        done = [job for job, error, _ in results if error is None]
+        failed = [(job, error) for job, error, _ in results if error is not None]
+        db = self.session_factory()
+        try:
+            if done:
+                db.execute(
+                    update(models.TaskJob)
+                    .where(models.TaskJob.id.in_([job.id for job in done]))
+                    .values(status="done", finished_at=now, error=None)
+                )
+                db.execute(
+                    update(models.Task)
+                    .where(models.Task.id.in_([job.task_id for job in done]))
+                    .values(status="done")
+                )
+            if failed:
+                # one executemany per table; retries go back to the queue. Core on
+                # the tables: the ORM can't executemany an UPDATE with a WHERE clause.
+                outcomes = [
+                    {"_id": job.id, "_task_id": job.task_id, "_error": error,
+                     "_status": "queued" if job.attempts < JOB_MAX_ATTEMPTS else "failed"}
+                    for job, error in failed
+                ]
+                jobs_table, tasks_table = models.TaskJob.__table__, models.Task.__table__
+                connection = db.connection()
+                connection.execute(
+                    update(jobs_table)
+                    .where(jobs_table.c.id == bindparam("_id"))
+                    .values(status=bindparam("_status"), error=bindparam("_error"), finished_at=now),
+                    outcomes,
+                )
+                connection.execute(
+                    update(tasks_table)
+                    .where(tasks_table.c.id == bindparam("_task_id"))
+                    .values(status=bindparam("_task_status")),
+                    [{"_task_id": o["_task_id"], "_task_status": "pending" if o["_status"] == "queued" else "failed"}
+                     for o in outcomes],
+                )
+            db.commit()
+        finally:
+            db.close()
+        response_cache.bump("tasks")
+        publish_status(((job.task_id, job.group_id) for job in done), "done")
+        for job, _ in failed:
+            publish_status([(job.task_id, job.group_id)], "pending" if job.attempts < JOB_MAX_ATTEMPTS else "failed")
+        retried = sum(1 for job, _ in failed if job.attempts < JOB_MAX_ATTEMPTS)
+        self._counters["processed"] += len(done)
+        self._counters["failed"] += len(failed) - retried
+        self._counters["retried"] += retried
+        if retried:
+            self.notify()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers if self._coroutines else 0,
+            "queued": self._queued,  # refreshed every JOB_DEPTH_INTERVAL
+            "buffered": self._jobs.qsize() if self._coroutines else 0,
+            **self._counters,
+            "wait_seconds_count": self._wait[0],
+            "wait_seconds_sum": self._wait[1],
+            "wait_seconds_max": self._wait[2],
+            "run_seconds_count": self._run[0],
+            "run_seconds_sum": self._run[1],
+            "run_seconds_max": self._run[2],
+        }
+
+def _observe(summary: list, seconds: float):
+    summary[0] += 1
+    summary[1] += seconds
+    summary[2] = max(summary[2], seconds)
+
+task_queue = TaskJobQueue()
+
+# -----------------------
+# Wake the dispatcher when a commit enqueues jobs
+# -----------------------
+def _collect_jobs(session, flush_context):
+    if any(isinstance(obj, models.TaskJob) for obj in session.new):
+        session.info["task_jobs_enqueued"] = True
+
+def _after_commit(session):
+    if session.info.pop("task_jobs_enqueued", False):
+        task_queue.notify()
+
+def _after_rollback(session):
+    session.info.pop("task_jobs_enqueued", None)
+
+event.listen(Session, "after_flush", _collect_jobs)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
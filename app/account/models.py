@@ -59,7 +59,8 @@
 #     assigned_group_id = Column(Integer, ForeignKey("groups.id"))
 #     status = Column(String(50), default="pending")
     
-from sqlalchemy import Column, Integer, String, Boolean, Date, Enum, Table, ForeignKey
+from datetime import datetime
+from sqlalchemy import DDL, Column, Integer, String, Boolean, Date, DateTime, Enum, Float, Table, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -106,7 +107,9 @@ user_group_link = Table(
     "user_group_link",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
-    Column("group_id", Integer, ForeignKey("groups.id"))
+    Column("group_id", Integer, ForeignKey("groups.id")),
+    # membership checks are index lookups, and a user can't be added twice
+    Index("ux_user_group_link_user_group", "user_id", "group_id", unique=True),
 )
 
 # -----------------
@@ -120,6 +123,48 @@ class Task(Base):
     assigned_group_id = Column(Integer, ForeignKey("groups.id"))
     status = Column(String(50), default="pending")
 
+    # keyset pagination filters: WHERE <col> = ? AND id > cursor ORDER BY id
+    __table_args__ = (
+        Index("ix_tasks_assigned_group_id_id", "assigned_group_id", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        # search: MATCH (title, description) AGAINST (...) on MySQL
+        Index("ft_tasks_title_description", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+# SQLite search index: an external-content FTS5 table over tasks, kept in sync by triggers
+TASKS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+for statement in TASKS_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
+
+# -----------------
+# Task jobs (durable queue drained by app/account/jobs.py)
+# -----------------
+class TaskJob(Base):
+    __tablename__ = "task_jobs"
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String(500))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    task = relationship("Task")
+
+    # the dispatcher claims the oldest queued jobs: WHERE status = 'queued' ORDER BY id
+    __table_args__ = (Index("ix_task_jobs_status_id", "status", "id"),)
+
 # -----------------
 # Permissions
 # -----------------
@@ -143,3 +188,21 @@ class Permission(Base):
     name = Column(String(100), unique=True, nullable=False)
 
     roles = relationship("Role", secondary=role_permission_link, back_populates="permissions")
+
+# -----------------
+# Revoked tokens (logout)
+# -----------------
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# -----------------
+# Rate limit buckets (shared token buckets for login/register throttling)
+# -----------------
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    key = Column(String(191), primary_key=True)  # "<scope>:<ip or username>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # unix time
+    full_at = Column(Float, nullable=False, index=True)  # when the bucket is full again; purge after
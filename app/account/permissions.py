@@ -0,0 +1,114 @@
+import os
+import threading
+from itertools import chain
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.account import models
+from app.core.cache import TTLCache
+
+# PERMISSION_CACHE_TTL=0 turns the cache off (every check hits the DB)
+PERMISSION_CACHE_TTL = float(os.getenv("PERMISSION_CACHE_TTL", "300"))
+PERMISSION_CACHE_SIZE = int(os.getenv("PERMISSION_CACHE_SIZE", "64"))
+
+# -----------------------
+# Permission index
+# -----------------------
+class PermissionIndex:
+    """Interns permission names to bit positions.
+
+    A role's permissions become an int bitmask, so checking any number of
+    permissions is one AND. Bits are assigned per process in first-seen
+    order and never reused; nothing persists them.
+
+    `generation` goes up whenever roles or permissions change, which marks
+    every mask computed earlier (e.g. stored on a Principal) as stale.
+    """
+
+    def __init__(self):
+        self._bits = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def bit(self, name: str) -> int:
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.setdefault(name, 1 << len(self._bits))
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+    def names(self, mask: int) -> list:
+        with self._lock:
+            bits = list(self._bits.items())
+        return [name for name, bit in bits if mask & bit]
+
+permission_index = PermissionIndex()
+
+_MISSING = object()
+role_masks_cache = TTLCache(maxsize=PERMISSION_CACHE_SIZE, ttl=PERMISSION_CACHE_TTL)
+
+# -----------------------
+# Lookup
+# -----------------------
+def get_role_mask(db: Session, role_name: str) -> Optional[int]:
+    """Bitmask of the permissions granted to `role_name`, or None if the role does not exist."""
+    mask = role_masks_cache.get(role_name, _MISSING)
+    if mask is not _MISSING:
+        return mask
+    return _cache_mask(role_name, db.execute(_role_permissions_query(role_name)).all())
+
+async def async_get_role_mask(db: AsyncSession, role_name: str) -> Optional[int]:
+    mask = role_masks_cache.get(role_name, _MISSING)
+    if mask is not _MISSING:
+        return mask
+    return _cache_mask(role_name, (await db.execute(_role_permissions_query(role_name))).all())
+
+def _role_permissions_query(role_name: str):
+    # one round-trip: outer join so a role without permissions still returns a row
+    return (
+        select(models.Role.id, models.Permission.name)
+        .outerjoin(models.Role.permissions)
+        .where(models.Role.name == role_name)
+    )
+
+def _cache_mask(role_name: str, rows) -> Optional[int]:
+    mask = permission_index.mask(name for _, name in rows if name is not None) if rows else None
+    role_masks_cache.set(role_name, mask)
+    return mask
+
+def invalidate_permissions(role_name: Optional[str] = None):
+    permission_index.generation += 1
+    if role_name is None:
+        role_masks_cache.clear()
+    else:
+        role_masks_cache.pop(role_name)
+
+# -----------------------
+# Invalidation hooks
+# -----------------------
+# Changes are flagged at flush and applied after commit, so a concurrent request
+# can't re-cache the old rows while the transaction is still open.
+@event.listens_for(Session, "after_flush")
+def _flag_permission_changes(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (models.Role, models.Permission)):
+            session.info["permissions_changed"] = True
+            return
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("permissions_changed", False):
+        invalidate_permissions()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_flag(session):
+    session.info.pop("permissions_changed", None)
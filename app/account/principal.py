@@ -0,0 +1,109 @@
+import os
+from dataclasses import dataclass
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.account import models
+from app.account.permissions import async_get_role_mask, get_role_mask, permission_index
+from app.core.cache import TTLCache
+
+# PRINCIPAL_CACHE_TTL=0 turns the cache off (every request loads the user row)
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# -----------------------
+# Principal
+# -----------------------
+# The authenticated caller as seen by route code: only the columns the
+# dependencies and handlers actually read, detached from any Session.
+# permission_mask is the user's effective permissions (None: role missing),
+# valid while permission_generation matches permission_index.generation.
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: models.UserRole
+    is_active: bool
+    permission_mask: Optional[int] = None
+    permission_generation: int = -1
+
+_PRINCIPAL_COLUMNS = (models.User.id, models.User.username, models.User.role, models.User.is_active)
+
+def _cache_principal(row, mask: Optional[int], generation: int) -> Principal:
+    principal = Principal(
+        id=row.id,
+        username=row.username,
+        role=row.role,
+        is_active=row.is_active,
+        permission_mask=mask,
+        permission_generation=generation,
+    )
+    principal_cache.set(row.username, principal)
+    return principal
+
+# Only the user's role grants permissions today (groups carry none), so the
+# effective mask is the role's mask.
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+    generation = permission_index.generation
+    row = db.query(*_PRINCIPAL_COLUMNS).filter(models.User.username == username).first()
+    if row is None:
+        return None
+    return _cache_principal(row, get_role_mask(db, row.role.value), generation)
+
+async def async_load_principal(db: AsyncSession, username: str) -> Optional[Principal]:
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+    generation = permission_index.generation
+    row = (await db.execute(select(*_PRINCIPAL_COLUMNS).where(models.User.username == username))).first()
+    if row is None:
+        return None
+    return _cache_principal(row, await async_get_role_mask(db, row.role.value), generation)
+
+def effective_mask(db: Session, principal: Principal) -> Optional[int]:
+    if principal.permission_generation == permission_index.generation:
+        return principal.permission_mask
+    return get_role_mask(db, principal.role.value)
+
+async def async_effective_mask(db: AsyncSession, principal: Principal) -> Optional[int]:
+    if principal.permission_generation == permission_index.generation:
+        return principal.permission_mask
+    return await async_get_role_mask(db, principal.role.value)
+
+def invalidate_principal(username: Optional[str] = None):
+    if username is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(username)
+
+# -----------------------
+# Invalidation hooks
+# -----------------------
+# Any flushed change to a User (role change, deactivation, rename, delete)
+# evicts that user's entry once the transaction commits.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_usernames", set())
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, models.User):
+            history = inspect(obj).attrs.username.history
+            # old and new names, so a rename evicts the entry under the previous key
+            changed.update(filter(None, history.sum()))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for username in session.info.pop("changed_usernames", ()):
+        invalidate_principal(username)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("changed_usernames", None)
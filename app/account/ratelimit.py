@@ -0,0 +1,169 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.account import models
+from app.core.metrics import registry
+from app.database import PrimarySessionLocal
+
+# memory: per-process buckets. database: shared by every worker via rate_limit_buckets.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# "<requests>/<seconds>": a bucket of <requests> tokens refilled over <seconds>. "0" disables.
+LOGIN_IP_RATE = os.getenv("LOGIN_IP_RATE", "20/60")
+LOGIN_USER_RATE = os.getenv("LOGIN_USER_RATE", "5/60")
+REGISTER_IP_RATE = os.getenv("REGISTER_IP_RATE", "5/60")
+
+def take_token(tokens: float, updated_at: float, now: float, rate: float, burst: float) -> Tuple[float, float]:
+    """Refill a bucket up to `now` and take one token.
+
+    Returns (tokens left, retry_after); retry_after is 0 when the token was granted.
+    """
+    tokens = min(burst, tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+# -----------------------
+# In-memory store
+# -----------------------
+class MemoryRateLimitStore:
+    """key -> (tokens, updated_at). The least recently used keys are dropped past
+    `max_keys`, which only ever resets a bucket to full (the lenient direction)."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens, retry_after = take_token(tokens, updated_at, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+# -----------------------
+# Database store
+# -----------------------
+class DatabaseRateLimitStore:
+    """Shared buckets on the rate_limit_buckets table.
+
+    Each hit reads the bucket row with SELECT ... FOR UPDATE and writes it back,
+    so concurrent workers can't both spend the last token. Rows whose bucket has
+    refilled completely carry no information and are purged periodically.
+    """
+
+    blocking = True
+    purge_every = 1000
+
+    def __init__(self, session_factory=PrimarySessionLocal):
+        self.session_factory = session_factory
+        self._hits = 0
+
+    def hit(self, key: str, rate: float, burst: float) -> float:
+        now = time.time()
+        db = self.session_factory()
+        try:
+            bucket = db.query(models.RateLimitBucket).filter(models.RateLimitBucket.key == key).with_for_update().first()
+            if bucket is None:
+                bucket = models.RateLimitBucket(key=key, tokens=burst, updated_at=now)
+                db.add(bucket)
+            tokens, retry_after = take_token(bucket.tokens, bucket.updated_at, now, rate, burst)
+            bucket.tokens = tokens
+            bucket.updated_at = now
+            bucket.full_at = now + (burst - tokens) / rate
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # another worker created the row first; let this one through
+                retry_after = 0.0
+            self._hits += 1
+            if self._hits % self.purge_every == 0:
+                db.execute(delete(models.RateLimitBucket).where(models.RateLimitBucket.full_at <= now))
+                db.commit()
+            return retry_after
+        finally:
+            db.close()
+
+def _build_store():
+    if RATE_LIMIT_BACKEND == "database":
+        return DatabaseRateLimitStore()
+    return MemoryRateLimitStore()
+
+rate_limit_store = _build_store()
+
+# -----------------------
+# Limits
+# -----------------------
+class RateLimit:
+    """A token bucket per key: `burst` requests at once, refilled at `burst / seconds` per second."""
+
+    def __init__(self, scope: str, spec: str, store=None):
+        self.scope = scope
+        self.store = store
+        requests, _, seconds = spec.partition("/")
+        self.burst = float(requests or 0)
+        self.rate = self.burst / float(seconds or 1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.burst > 0
+
+    async def check(self, key: str):
+        """Raise 429 with Retry-After when `key` is out of tokens."""
+        if not self.enabled:
+            return
+        store = self.store or rate_limit_store
+        bucket = f"{self.scope}:{key}"
+        if store.blocking:
+            retry_after = await run_in_threadpool(store.hit, bucket, self.rate, self.burst)
+        else:
+            retry_after = store.hit(bucket, self.rate, self.burst)
+        if retry_after:
+            registry.incr("rate_limited_total", scope=self.scope)
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+login_ip_limit = RateLimit("login_ip", LOGIN_IP_RATE)
+login_user_limit = RateLimit("login_user", LOGIN_USER_RATE)
+register_ip_limit = RateLimit("register_ip", REGISTER_IP_RATE)
+
+# Behind a proxy, run uvicorn with --proxy-headers so request.client is the real client
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+# -----------------------
+# Dependencies
+# -----------------------
+# Both run before the route body, so a throttled attempt never reaches the
+# user lookup or bcrypt. FastAPI caches OAuth2PasswordRequestForm per request,
+# so login parses its form once.
+async def login_throttle(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    await login_ip_limit.check(client_ip(request))
+    await login_user_limit.check(form_data.username.lower())
+
+async def register_throttle(request: Request):
+    await register_ip_limit.check(client_ip(request))
@@ -0,0 +1,103 @@
+import hashlib
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.account import models
+from app.database import PrimarySessionLocal
+
+# memory: per-process, fastest. database: shared by every worker via revoked_tokens.
+TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "memory")
+
+def token_id(payload: dict, token: str) -> str:
+    """The token's jti; tokens issued before jti existed fall back to a digest of the token."""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()[:32]
+
+# -----------------------
+# In-memory store
+# -----------------------
+class MemoryRevocationStore:
+    """jti -> exp map. Entries are dropped once the token would have expired anyway,
+    so the store holds at most the tokens revoked within one token lifetime."""
+
+    blocking = False
+
+    def __init__(self):
+        self._revoked = {}
+        self._expiry = []  # min-heap of (exp, jti)
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: float):
+        with self._lock:
+            self._purge(time.time())
+            if exp > time.time() and jti not in self._revoked:
+                self._revoked[jti] = exp
+                heapq.heappush(self._expiry, (exp, jti))
+
+    def is_revoked(self, jti: str) -> bool:
+        exp = self._revoked.get(jti)
+        return exp is not None and exp > time.time()
+
+    def _purge(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._revoked.pop(jti, None)
+
+    def __len__(self):
+        return len(self._revoked)
+
+# -----------------------
+# Database store
+# -----------------------
+class DatabaseRevocationStore:
+    """Shared store on the revoked_tokens table (primary-key lookups).
+
+    Revocations made by this process are also kept in memory, so they are
+    seen without a query.
+    """
+
+    blocking = True
+    purge_every = 500
+
+    def __init__(self, session_factory=PrimarySessionLocal):
+        self.session_factory = session_factory
+        self.local = MemoryRevocationStore()
+        self._revocations = 0
+
+    def revoke(self, jti: str, exp: float):
+        self.local.revoke(jti, exp)
+        db = self.session_factory()
+        try:
+            db.add(models.RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(exp)))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # already revoked
+            self._revocations += 1
+            if self._revocations % self.purge_every == 0:
+                db.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at <= datetime.utcnow()))
+                db.commit()
+        finally:
+            db.close()
+
+    def is_revoked(self, jti: str) -> bool:
+        if self.local.is_revoked(jti):
+            return True
+        db = self.session_factory()
+        try:
+            row = db.get(models.RevokedToken, jti)
+            return row is not None and row.expires_at > datetime.utcnow()
+        finally:
+            db.close()
+
+def _build_store():
+    if TOKEN_REVOCATION_BACKEND == "database":
+        return DatabaseRevocationStore()
+    return MemoryRevocationStore()
+
+revocation_store = _build_store()
@@ -252,24 +252,44 @@
 #         )
 
 
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import timedelta
-from typing import Optional
+from typing import Literal, Optional
 
-from app.database import get_db
+from app.database import get_db, get_sessionmaker
 from app.account import models, schemas
+from app.account import crud
+from app.account import bulk
+from app.account.bulk import detect_format, import_users, parse_rows
+from app.account.export import MEDIA_TYPES, TASK_COLUMNS, USER_COLUMNS, stream_rows
+from app.account.feed import sse_stream, task_filter
+from app.account.jobs import task_queue
+from app.account.permissions import permission_index
+from app.account.principal import Principal, effective_mask, invalidate_principal, load_principal
+from app.account.ratelimit import login_throttle, register_throttle
+from app.account.revocation import revocation_store, token_id
+from app.account.search import (
+    SEARCH_MAX_OFFSET, decode_user_cursor, encode_user_cursor, search_tasks, search_users,
+)
+from app.core.hashing import HashingBusy, password_hasher
+from app.core.metrics import timed
+from app.core.response_cache import etag_matches, make_etag, response_cache
+from app.core.serialization import rows_to_json
+from jose import JWTError
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     decode_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 
 router = APIRouter()
-blacklist_tokens = set()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/account/login")
 
 # -----------------------
@@ -278,82 +298,112 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/account/login")
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def create_user(db: Session, user: schemas.UserCreate, is_superadmin: bool = False):
+# One INSERT: SessionLocal keeps attributes loaded after commit, and groups is
+# set to [] up front so serializing on the event loop never lazy loads
+def _save_user(db: Session, db_user: models.User):
+    db_user.groups = []
+    db.add(db_user)
+    db.commit()
+    return db_user
+
+# bcrypt runs on password_hasher's pool and DB work on the threadpool,
+# so neither blocks the event loop
+async def create_user(db: Session, user: schemas.UserCreate, is_superadmin: bool = False):
     db_user = models.User(
         username=user.username,
         email=user.email,
-        password=hash_password(user.password),
+        password=await password_hasher.hash(user.password),
         birthdate=getattr(user, "birthdate", None),
         role=models.UserRole.user,  # default user
     )
     if is_superadmin:
         db_user.role = models.UserRole.superadmin
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_in_threadpool(_save_user, db, db_user)
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(db: Session, username: str, password: str):
+    user = await run_in_threadpool(get_user_by_username, db, username)
+    if not user or not await password_hasher.verify(password, user.password):
         return None
     return user
 
 # -----------------------
 # Dependencies
 # -----------------------
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    if token in blacklist_tokens:
-        raise HTTPException(status_code=401, detail="Token revoked")
-    payload = decode_access_token(token)
+def decode_token(token: str) -> dict:
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        payload = None
     if payload is None or "sub" not in payload:
         raise HTTPException(status_code=401, detail="Invalid token")
-    username = payload.get("sub")
-    user = get_user_by_username(db, username)
-    if user is None:
+    return payload
+
+def token_subject(token: str) -> str:
+    with timed("jwt"):
+        payload = decode_token(token)
+    if revocation_store.is_revoked(token_id(payload, token)):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return payload.get("sub")
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    principal = load_principal(db, token_subject(token))
+    if principal is None:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    return principal
 
 # Role check
 def role_required(*roles: models.UserRole):
-    def dependency(current_user: models.User = Depends(get_current_user)):
+    def dependency(current_user: Principal = Depends(get_current_user)):
         if current_user.role not in roles:
             raise HTTPException(status_code=403, detail="Access denied for your role")
         return current_user
     return dependency
 
 # Superadmin only
-def superadmin_required(current_user: models.User = Depends(get_current_user)):
+def superadmin_required(current_user: Principal = Depends(get_current_user)):
     if current_user.role != models.UserRole.superadmin:
         raise HTTPException(status_code=403, detail="Superadmin required")
     return current_user
 
-# Permission check
-def permission_required(permission_name: str):
+# Permission check: all of `permission_names`, as one bitwise AND
+def permission_required(*permission_names: str):
+    required = permission_index.mask(permission_names)
+
     def dependency(
-        current_user: models.User = Depends(get_current_user),
+        current_user: Principal = Depends(get_current_user),
         db: Session = Depends(get_db),
     ):
-        role = db.query(models.Role).filter(models.Role.name == current_user.role.value).first()
-        if not role:
-            raise HTTPException(status_code=403, detail="Role not found")
-        if not any(p.name == permission_name for p in role.permissions):
-            raise HTTPException(status_code=403, detail=f"Permission '{permission_name}' required")
+        with timed("permissions"):
+            mask = effective_mask(db, current_user)
+        check_permissions(mask, required)
         return current_user
     return dependency
 
+def check_permissions(mask: Optional[int], required: int):
+    if mask is None:
+        raise HTTPException(status_code=403, detail="Role not found")
+    if mask & required != required:
+        missing = ", ".join(permission_index.names(required & ~mask))
+        raise HTTPException(status_code=403, detail=f"Permission '{missing}' required")
+
 # -----------------------
 # Auth Routes
 # -----------------------
-@router.post("/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    if get_user_by_username(db, user.username):
+@router.post("/register", response_model=schemas.UserResponse, dependencies=[Depends(register_throttle)])
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(get_user_by_username, db, user.username):
         raise HTTPException(status_code=400, detail="Username already exists")
-    return create_user(db, user, is_superadmin=False)
-
-@router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        return await create_user(db, user, is_superadmin=False)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
+
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_throttle)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     access_token = create_access_token(
@@ -364,9 +414,20 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 @router.post("/logout")
 def logout(token: str = Depends(oauth2_scheme)):
-    blacklist_tokens.add(token)
+    payload = decode_token(token)
+    revocation_store.revoke(token_id(payload, token), payload["exp"])
     return {"msg": "Logged out successfully"}
 
+@router.get("/users/me", response_model=schemas.UserResponse)
+def read_current_user(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    db_user = crud.get_user_with_groups(db, current_user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
 # -----------------------
 # Group & User Management
 # -----------------------
@@ -374,15 +435,16 @@ def logout(token: str = Depends(oauth2_scheme)):
 def create_group(
     group: schemas.GroupBase,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("create_group")),
+    current_user: Principal = Depends(permission_required("create_group")),
 ):
-    existing_group = db.query(models.Group).filter(models.Group.name == group.name).first()
-    if existing_group:
-        raise HTTPException(status_code=400, detail="Group already exists")
-    db_group = models.Group(name=group.name)
+    # the unique index on name rejects duplicates, so no SELECT beforehand
+    db_group = models.Group(name=group.name, users=[])
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Group already exists")
     return db_group
 
 @router.post("/groups/{group_id}/assign/{user_id}")
@@ -390,18 +452,58 @@ def assign_user_to_group(
     group_id: int,
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("assign_user")),
+    current_user: Principal = Depends(permission_required("assign_user")),
 ):
     group = db.query(models.Group).filter(models.Group.id == group_id).first()
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not group or not user:
         raise HTTPException(status_code=404, detail="User or Group not found")
-    if user in group.users:
+    if crud.is_group_member(db, group_id, user_id):
+        raise HTTPException(status_code=400, detail="User already in group")
+    try:
+        db.execute(models.user_group_link.insert().values(user_id=user_id, group_id=group_id))
+        db.commit()
+    except IntegrityError:
+        # a concurrent request added the same link
+        db.rollback()
         raise HTTPException(status_code=400, detail="User already in group")
-    group.users.append(user)
-    db.commit()
     return {"msg": f"User {user.username} added to group {group.name}"}
 
+@router.get("/groups/{group_id}", response_model=schemas.GroupResponse)
+def read_group(
+    group_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("assign_user")),
+):
+    db_group = crud.get_group_with_users(db, group_id)
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return db_group
+
+def _get_group_or_404(db: Session, group_id: int):
+    if db.query(models.Group.id).filter(models.Group.id == group_id).first() is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+
+@router.post("/groups/{group_id}/members", response_model=schemas.GroupMembersResult)
+def add_group_members(
+    group_id: int,
+    body: schemas.GroupMembersUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("assign_user")),
+):
+    _get_group_or_404(db, group_id)
+    return crud.add_group_members(db, group_id, body.user_ids)
+
+@router.post("/groups/{group_id}/members/remove", response_model=schemas.GroupMembersResult)
+def remove_group_members(
+    group_id: int,
+    body: schemas.GroupMembersUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("assign_user")),
+):
+    _get_group_or_404(db, group_id)
+    return crud.remove_group_members(db, group_id, body.user_ids)
+
 # -----------------------
 # Task Routes
 # -----------------------
@@ -409,7 +511,7 @@ def assign_user_to_group(
 def create_task(
     task: schemas.TaskCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("create_task"))
+    current_user: Principal = Depends(permission_required("create_task"))
 ):
     db_task = models.Task(
         title=task.title,
@@ -417,34 +519,211 @@ def create_task(
         assigned_group_id=task.assigned_group_id
     )
     db.add(db_task)
+    # queued in the same transaction; the background workers pick it up after commit
+    if task_queue.enabled:
+        db.add(models.TaskJob(task=db_task))
     db.commit()
-    db.refresh(db_task)
     return db_task
 
+# -----------------------
+# Bulk task writes: one permission check, per-item results in request order
+# -----------------------
+def _check_bulk_size(items: list):
+    if len(items) > bulk.BULK_TASK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {bulk.BULK_TASK_MAX_ITEMS} tasks per request")
+
+@router.post("/tasks/bulk", response_model=schemas.BulkTaskResult)
+def create_tasks_bulk(
+    tasks: list[schemas.TaskCreate],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("create_task"))
+):
+    _check_bulk_size(tasks)
+    return bulk.create_tasks(db, tasks)
+
+@router.patch("/tasks/bulk", response_model=schemas.BulkTaskResult)
+def update_tasks_bulk(
+    patches: list[schemas.TaskPatch],
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("update_task"))
+):
+    _check_bulk_size(patches)
+    return bulk.update_tasks(db, patches)
+
+def task_page_params(
+    after: Optional[int] = Query(None, description="Cursor: return tasks with id greater than this"),
+    limit: int = Query(crud.TASKS_PAGE_SIZE, ge=1, le=crud.TASKS_MAX_PAGE_SIZE),
+    assigned_group_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> dict:
+    return {"after": after, "limit": limit, "assigned_group_id": assigned_group_id, "status": status}
+
+# -----------------------
+# Task list caching: rendered pages are cached per (query, role) and dropped
+# whenever a Task commit bumps the "tasks" version. Clients revalidate with
+# If-None-Match and get 304 when nothing changed.
+# -----------------------
+response_cache.invalidate_on_commit("tasks", models.Task)
+
+def tasks_cache_key(page: dict, current_user: Principal) -> tuple:
+    return response_cache.key("tasks", tuple(sorted(page.items())), current_user.role.value)
+
+def tasks_response(request: Request, entry: tuple) -> Response:
+    etag, body, next_cursor = entry
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# rows come from crud.TASK_RESPONSE_COLUMNS and go straight to JSON
+def render_tasks_page(key: tuple, rows, next_cursor) -> tuple:
+    body = rows_to_json(rows)
+    entry = (make_etag(body), body, next_cursor)
+    response_cache.set(key, entry)
+    return entry
+
+# Next page cursor goes in the X-Next-Cursor header so the body stays a plain list
 @router.get("/tasks", response_model=list[schemas.TaskResponse])
 def list_tasks(
+    request: Request,
+    page: dict = Depends(task_page_params),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("view_task"))
+    current_user: Principal = Depends(permission_required("view_task"))
 ):
-    return db.query(models.Task).all()
+    key = tasks_cache_key(page, current_user)
+    entry = response_cache.get(key)
+    if entry is None:
+        rows, next_cursor = crud.list_tasks_page(db, **page)
+        entry = render_tasks_page(key, rows, next_cursor)
+    return tasks_response(request, entry)
+
+# Server-Sent Events: task.created / task.updated / task.status deltas for the
+# caller's groups. Reconnecting clients send Last-Event-ID to resume; an
+# "event: reset" means events were missed and the list should be refetched.
+@router.get("/tasks/events")
+def task_events(
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id (or send Last-Event-ID)"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("view_task"))
+):
+    accept = task_filter(db, current_user)
+    db.close()  # hand the connection back now; the stream can stay open for hours
+    return StreamingResponse(
+        sse_stream(accept, request.headers.get("last-event-id") or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put("/tasks/{task_id}", response_model=schemas.TaskResponse)
 def update_task(
     task_id: int,
     task: schemas.TaskCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("update_task"))
+    current_user: Principal = Depends(permission_required("update_task"))
 ):
-    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    values = {"title": task.title, "description": task.description, "assigned_group_id": task.assigned_group_id}
+    if db.get_bind().dialect.update_returning:
+        # UPDATE ... RETURNING: one statement instead of SELECT + UPDATE
+        row = db.execute(
+            update(models.Task).where(models.Task.id == task_id).values(**values)
+            .returning(*crud.TASK_RESPONSE_COLUMNS),
+            execution_options={"synchronize_session": False},
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        db.commit()
+        data = row._asdict()
+        bulk.tasks_written("task.updated", [data])
+        return data
+    db_task = db.get(models.Task, task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
-    db_task.title = task.title
-    db_task.description = task.description
-    db_task.assigned_group_id = task.assigned_group_id
+    for key, value in values.items():
+        setattr(db_task, key, value)
     db.commit()
-    db.refresh(db_task)
     return db_task
 
+# -----------------------
+# Search
+# -----------------------
+# Ranked, so pages are offset based: X-Next-Cursor holds the next offset.
+# Cached with the task pages and dropped by the same "tasks" version bump.
+@router.get("/search/tasks", response_model=list[schemas.TaskResponse])
+def search_tasks_route(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(crud.TASKS_PAGE_SIZE, ge=1, le=crud.TASKS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("view_task"))
+):
+    key = tasks_cache_key({"search": q, "limit": limit, "offset": offset}, current_user)
+    entry = response_cache.get(key)
+    if entry is None:
+        rows, next_offset = search_tasks(db, q, limit, offset)
+        entry = render_tasks_page(key, rows, next_offset)
+    return tasks_response(request, entry)
+
+# Username or email prefix, ordered by username; X-Next-Cursor is the last username, base64url encoded
+@router.get("/search/users", response_model=list[schemas.UserSearchResult])
+def search_users_route(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(crud.TASKS_PAGE_SIZE, ge=1, le=crud.TASKS_MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor: X-Next-Cursor of the previous page"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(permission_required("assign_user"))
+):
+    try:
+        after = decode_user_cursor(after) if after is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows, next_cursor = search_users(db, prefix, limit, after)
+    headers = {"X-Next-Cursor": encode_user_cursor(next_cursor)} if next_cursor is not None else None
+    return Response(content=rows_to_json(rows), media_type="application/json", headers=headers)
+
+# -----------------------
+# Export (streamed row by row)
+# -----------------------
+@router.get("/export/tasks")
+def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory: sessionmaker = Depends(get_sessionmaker),
+    current_user: Principal = Depends(permission_required("view_task")),
+):
+    return StreamingResponse(
+        stream_rows(session_factory, TASK_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{format}"},
+    )
+
+@router.get("/export/users")
+def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory: sessionmaker = Depends(get_sessionmaker),
+    current_user: Principal = Depends(superadmin_required),
+):
+    return StreamingResponse(
+        stream_rows(session_factory, USER_COLUMNS, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
+
+# -----------------------
+# Bulk user import (CSV or NDJSON upload)
+# -----------------------
+@router.post("/users/import", response_model=schemas.BulkImportResult)
+def bulk_import_users(
+    file: UploadFile = File(...),
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(superadmin_required),
+):
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return import_users(db, parse_rows(stream, format or detect_format(file.filename)))
+
 # -----------------------
 # User Role Management
 # -----------------------
@@ -453,7 +732,7 @@ def update_user_role(
     user_id: int,
     new_role: models.UserRole,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(permission_required("change_role")),
+    current_user: Principal = Depends(permission_required("change_role")),
 ):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -464,5 +743,5 @@ def update_user_role(
 
     user.role = new_role
     db.commit()
-    db.refresh(user)
+    invalidate_principal(user.username)
     return {"msg": f"User {user.username} promoted to {new_role}"}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List,Optional
 from enum import Enum
 from datetime import date
@@ -27,6 +27,21 @@ class GroupResponse(GroupBase):
     users: List[str] = []
     model_config = {"from_attributes": True}
 
+    # ORM theke User object ase, response e shudhu username jabe
+    @field_validator("users", mode="before")
+    @classmethod
+    def usernames(cls, users):
+        return [u if isinstance(u, str) else u.username for u in users or []]
+
+class GroupMembersUpdate(BaseModel):
+    user_ids: List[int]
+
+class GroupMembersResult(BaseModel):
+    group_id: int
+    changed: List[int] = []     # added ba removed
+    unchanged: List[int] = []   # already member (add) / not a member (remove)
+    not_found: List[int] = []   # user id nei
+
 class UserBase(BaseModel):
     username: str
     email: str
@@ -50,10 +65,27 @@ class UserResponse(UserBase):
     groups: List[GroupResponse] = []
     model_config = {"from_attributes": True}
 
+# search result e shudhu ei fields lage, groups load kora hoy na
+class UserSearchResult(BaseModel):
+    id: int
+    username: str
+    email: str
+    model_config = {"from_attributes": True}
+
 class Token(BaseModel):
     access_token: str
     token_type: str
 
+# bulk import e je row gula fail kore tader row number + karon
+class RowError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[RowError] = []
+
 
 class TaskBase(BaseModel):
     title: str
@@ -71,6 +103,24 @@ class TaskResponse(TaskBase):
 
     # model_config = {"from_attributes": True} (v2)   class config(v1) ar model_config same e kaj kore just likha alada
 
+# bulk update e shudhu je field gula pathano hoy shegulai change hoy
+class TaskPatch(BaseModel):
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    assigned_group_id: Optional[int] = None
+
+# request array er index (0 theke) + created/updated task id ba error
+class BulkTaskItem(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkTaskResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkTaskItem] = []
+
 class PermissionBase(BaseModel):
     name: str
 
@@ -0,0 +1,181 @@
+import base64
+import binascii
+import os
+import threading
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import and_, column, event, inspect, select, table, text, union
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.account import models
+from app.account.crud import TASK_RESPONSE_COLUMNS
+from app.core.search import TrigramIndex, words
+
+# auto: MySQL FULLTEXT or SQLite FTS5 when the index exists, else the in-process
+# trigram index. memory: always the trigram index. The trigram index lives in
+# each worker and only sees that worker's writes (plus what it loaded at first
+# search), so with several workers use MySQL or SQLite FTS5.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.5"))
+SEARCH_LOAD_BATCH_SIZE = int(os.getenv("SEARCH_LOAD_BATCH_SIZE", "5000"))
+
+task_index = TrigramIndex(min_similarity=SEARCH_MIN_SIMILARITY)
+
+_backends = {}  # engine -> "mysql" | "fts5" | "memory"
+_load_lock = threading.Lock()
+
+def search_backend(db: Session) -> str:
+    engine = db.get_bind().engine
+    backend = _backends.get(engine)
+    if backend is None:
+        if SEARCH_BACKEND == "memory":
+            backend = "memory"
+        elif engine.dialect.name == "mysql":
+            backend = "mysql"
+        elif engine.dialect.name == "sqlite" and inspect(engine).has_table("tasks_fts"):
+            backend = "fts5"
+        else:
+            backend = "memory"
+        _backends[engine] = backend
+    return backend
+
+# -----------------------
+# Task search
+# -----------------------
+# Every query word must match the start of a word in the title or description.
+# Ranked queries can't use a keyset cursor, so pages are offset based and
+# SEARCH_MAX_OFFSET caps how deep a client can page.
+def _mysql_query(terms):
+    # BOOLEAN MODE: +word* requires each word as a prefix; MATCH() doubles as the score
+    against = " ".join(f"+{term}*" for term in terms)
+    score = match(models.Task.title, models.Task.description, against=against).in_boolean_mode()
+    return select(*TASK_RESPONSE_COLUMNS).where(score > 0).order_by(score.desc(), models.Task.id)
+
+# external-content FTS5 table created next to `tasks` (see models.TASKS_FTS_DDL)
+tasks_fts = table("tasks_fts", column("rowid"))
+
+def _fts5_query(terms):
+    query = " ".join(f'"{term}"*' for term in terms)
+    return (
+        select(*TASK_RESPONSE_COLUMNS)
+        .join(tasks_fts, tasks_fts.c.rowid == models.Task.id)
+        .where(text("tasks_fts MATCH :q").bindparams(q=query))
+        # bm25() is lower for better matches
+        .order_by(text("bm25(tasks_fts)"), models.Task.id)
+    )
+
+def _load_task_index(db: Session):
+    with _load_lock:
+        if task_index.loaded:
+            return
+        rows = db.execute(
+            select(models.Task.id, models.Task.title, models.Task.description)
+            .execution_options(yield_per=SEARCH_LOAD_BATCH_SIZE)
+        )
+        task_index.load((row.id, _task_text(row.title, row.description)) for row in rows)
+
+def _memory_search(db: Session, q: str, limit: int, offset: int):
+    if not task_index.loaded:
+        _load_task_index(db)
+    hits = task_index.search(q, limit + 1, offset)
+    if not hits:
+        return []
+    rows = {row.id: row for row in db.execute(
+        select(*TASK_RESPONSE_COLUMNS).where(models.Task.id.in_([doc_id for doc_id, _ in hits]))
+    )}
+    # a task deleted outside the ORM may still be indexed; skip it
+    return [rows[doc_id] for doc_id, _ in hits if doc_id in rows]
+
+def search_tasks(db: Session, q: str, limit: int, offset: int = 0):
+    """(rows, next_offset) best match first; rows are TASK_RESPONSE_COLUMNS tuples."""
+    terms = words(q)
+    if not terms:
+        return [], None
+    backend = search_backend(db)
+    if backend == "memory":
+        rows = _memory_search(db, q, limit, offset)
+    else:
+        query = _mysql_query(terms) if backend == "mysql" else _fts5_query(terms)
+        rows = db.execute(query.limit(limit + 1).offset(offset)).all()
+    if len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
+
+# -----------------------
+# Keeping the trigram index in sync
+# -----------------------
+# Only needed once the index is loaded. Values are captured at flush time
+# because commit expires the instances.
+def _task_text(title: Optional[str], description: Optional[str]) -> str:
+    return f"{title or ''} {description or ''}"
+
+def _collect_tasks(session, flush_context):
+    if not task_index.loaded:
+        return
+    changes = session.info.setdefault("search_task_changes", {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, models.Task):
+            changes[obj.id] = _task_text(obj.title, obj.description)
+    for obj in session.deleted:
+        if isinstance(obj, models.Task):
+            changes[obj.id] = None
+
+def _apply_tasks(session):
+    for task_id, task_text in session.info.pop("search_task_changes", {}).items():
+        if task_text is None:
+            task_index.remove(task_id)
+        else:
+            task_index.add(task_id, task_text)
+
+def _discard_tasks(session):
+    session.info.pop("search_task_changes", None)
+
+def index_tasks(tasks):
+    """Apply committed Core writes (bulk insert/update) that the ORM hooks can't see.
+    tasks: dicts with id, title and description."""
+    if task_index.loaded:
+        for task in tasks:
+            task_index.add(task["id"], _task_text(task["title"], task["description"]))
+
+event.listen(Session, "after_flush", _collect_tasks)
+event.listen(Session, "after_commit", _apply_tasks)
+event.listen(Session, "after_rollback", _discard_tasks)
+
+# -----------------------
+# User prefix search
+# -----------------------
+# `col >= prefix AND col < successor` is a range scan on the unique
+# username / email indexes on every backend; LIKE 'p%' is not on SQLite.
+USER_SEARCH_COLUMNS = (models.User.id, models.User.username, models.User.email)
+
+def _prefix_range(col, prefix: str):
+    successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(col >= prefix, col < successor)
+
+# The cursor is a username, which may be any Unicode text; base64url keeps it
+# safe for the latin-1-only X-Next-Cursor header.
+def encode_user_cursor(username: str) -> str:
+    return base64.urlsafe_b64encode(username.encode()).decode().rstrip("=")
+
+def decode_user_cursor(cursor: str) -> str:
+    """Raises ValueError for a cursor encode_user_cursor didn't produce."""
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def search_users(db: Session, prefix: str, limit: int, after: Optional[str] = None):
+    """(rows, next_cursor) ordered by username; matches username or email prefix."""
+    by_username = select(*USER_SEARCH_COLUMNS).where(_prefix_range(models.User.username, prefix))
+    by_email = select(*USER_SEARCH_COLUMNS).where(_prefix_range(models.User.email, prefix))
+    if after is not None:
+        by_username = by_username.where(models.User.username > after)
+        by_email = by_email.where(models.User.username > after)
+    matches = union(by_username, by_email).subquery()
+    rows = db.execute(select(matches).order_by(matches.c.username).limit(limit + 1)).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].username
+    return rows, None
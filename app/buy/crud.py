@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+from app.buy import models, schemas
+from app.core import market
+from app.core.orderbook import BUY
+
+def fill_responses(fills):
+    return [
+        schemas.FillResponse(buy_order_id=f.buy_id, sell_order_id=f.sell_id, price=f.price, quantity=f.quantity)
+        for f in fills
+    ]
+
+def place_buy_order(db: Session, user_id: int, order: schemas.BuyOrderCreate):
+    db_order, fills = market.place_order(db, BUY, user_id, order.item, order.price, order.quantity)
+    return {"order": db_order, "fills": fill_responses(fills)}
+
+def get_buy_order(db: Session, order_id: int):
+    return db.get(models.BuyOrder, order_id)
+
+def list_buy_orders(db: Session, user_id: int, limit: int):
+    return (
+        db.query(models.BuyOrder)
+        .filter(models.BuyOrder.user_id == user_id)
+        .order_by(models.BuyOrder.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+def cancel_buy_order(db: Session, db_order: models.BuyOrder) -> bool:
+    return market.cancel_order(db, BUY, db_order)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+# -----------------
+# Buy orders (bids)
+# -----------------
+# price is in minor units (cents); filled counts the quantity already traded
+class BuyOrder(Base):
+    __tablename__ = "buy_orders"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    item = Column(String(50), nullable=False)
+    price = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    filled = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="open")  # open, filled, cancelled
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # rebuilding a book loads the open orders of one item
+    __table_args__ = (Index("ix_buy_orders_item_status", "item", "status"),)
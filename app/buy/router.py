@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.market import BookConflict
+from app.database import get_db
+from app.buy import crud, schemas
+from app.account.principal import Principal
+from app.account.router import get_current_user
+
+router = APIRouter()
+
+# -----------------------
+# Buy orders
+# -----------------------
+@router.post("/orders", response_model=schemas.BuyOrderPlaced)
+def place_buy_order(
+    order: schemas.BuyOrderCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        return crud.place_buy_order(db, current_user.id, order)
+    except BookConflict:
+        raise HTTPException(status_code=409, detail="The order book changed while placing the order, try again")
+
+@router.get("/orders", response_model=list[schemas.BuyOrderResponse])
+def list_my_buy_orders(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return crud.list_buy_orders(db, current_user.id, limit)
+
+@router.get("/orders/{order_id}", response_model=schemas.BuyOrderResponse)
+def get_buy_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    db_order = crud.get_buy_order(db, order_id)
+    if not db_order or db_order.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return db_order
+
+@router.delete("/orders/{order_id}", response_model=schemas.BuyOrderResponse)
+def cancel_buy_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    db_order = crud.get_buy_order(db, order_id)
+    if not db_order or db_order.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if not crud.cancel_buy_order(db, db_order):
+        raise HTTPException(status_code=400, detail=f"Order is already {db_order.status}")
+    return db_order
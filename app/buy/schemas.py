@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+# price sob somoy minor unit e (cents), tai int
+class BuyOrderCreate(BaseModel):
+    item: str = Field(min_length=1, max_length=50)
+    price: int = Field(gt=0)
+    quantity: int = Field(gt=0)
+
+class BuyOrderResponse(BaseModel):
+    id: int
+    user_id: int
+    item: str
+    price: int
+    quantity: int
+    filled: int
+    status: str
+    created_at: datetime
+    model_config = {"from_attributes": True}
+
+class FillResponse(BaseModel):
+    buy_order_id: int
+    sell_order_id: int
+    price: int
+    quantity: int
+
+class BuyOrderPlaced(BaseModel):
+    order: BuyOrderResponse
+    fills: List[FillResponse] = []
@@ -0,0 +1,123 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.metrics import timed
+from app.core.security import hash_password, verify_password
+
+# bcrypt releases the GIL, so threads scale across cores; "process" is available
+# for passlib backends that don't.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# queued + running hashes allowed before new requests are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+# bulk imports get their own process pool so they can't starve logins
+PASSWORD_HASH_BULK_WORKERS = int(os.getenv("PASSWORD_HASH_BULK_WORKERS", str(os.cpu_count() or 2)))
+
+
+def _process_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded worker pool.
+
+    Keeps bcrypt off the event loop and out of Starlette's request threadpool,
+    and rejects work instead of queueing without limit when it falls behind.
+    """
+
+    def __init__(self, workers: int, max_pending: int, executor: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_kind = executor
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == "process":
+                        # never fork a multi-threaded server: a child could inherit a lock
+                        # (DB pool, logging) held by another thread and deadlock
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_process_context())
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusy("Password hashing queue is full")
+            self.pending += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        with timed("bcrypt"):
+            return await asyncio.wrap_future(self.submit(hash_password, password))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        with timed("bcrypt"):
+            return await asyncio.wrap_future(self.submit(verify_password, plain_password, hashed_password))
+
+    def hash_sync(self, password: str) -> str:
+        return self.submit(hash_password, password).result()
+
+    def hash_many(self, passwords, chunksize: int = 16) -> list:
+        """Hash a batch in parallel, preserving order. Not subject to max_pending."""
+        hashed = list(self.executor.map(hash_password, passwords, chunksize=chunksize))
+        with self._lock:
+            self.completed += len(hashed)
+        return hashed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "queue_depth": max(self.pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    executor=PASSWORD_HASH_EXECUTOR,
+)
+
+bulk_password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_BULK_WORKERS,
+    max_pending=0,  # hash_many only
+    executor="process",
+)
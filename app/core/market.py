@@ -0,0 +1,177 @@
+import threading
+from collections import defaultdict
+
+from sqlalchemy import bindparam, case, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.buy.models import BuyOrder
+from app.sell.models import SellOrder, Trade
+from app.core.orderbook import BUY, SELL, BookOrder, OrderBook, engine
+
+SIDES = {BUY: BuyOrder, SELL: SellOrder}
+
+# a placement whose book turned out stale is retried this many times on a fresh one
+CONFLICT_RETRIES = 3
+
+_load_lock = threading.Lock()
+
+class BookConflict(Exception):
+    """A resting order changed in the DB behind this process's book (another worker
+    filled or cancelled it). The book is dropped and rebuilt on next use."""
+
+# -----------------------
+# Loading
+# -----------------------
+def load_book(db: Session, item: str, cache_empty: bool = True) -> OrderBook:
+    """The item's book, rebuilt from its open orders on first use.
+
+    cache_empty=False returns a book with no orders without keeping it, so
+    reads of items nobody trades don't fill the engine.
+    """
+    book = engine.get(item)
+    if book is not None:
+        return book
+    with _load_lock:
+        book = engine.get(item)
+        if book is not None:
+            return book
+        book = OrderBook(item=item)
+        # the book must match the latest committed orders; never rebuild it from a replica
+        db.info["use_primary"] = True
+        resting = []
+        for side, model in SIDES.items():
+            rows = db.execute(
+                select(model.id, model.user_id, model.price, model.quantity, model.filled, model.created_at)
+                .where(model.item == item, model.status == "open")
+            )
+            resting.extend((row.created_at, row.id, side, row) for row in rows)
+        # time priority survives restarts: sequence numbers follow creation order
+        for _, _, side, row in sorted(resting, key=lambda r: (r[0], r[1])):
+            book.add_resting(BookOrder(
+                side=side,
+                id=row.id,
+                user_id=row.user_id,
+                price=row.price,
+                remaining=row.quantity - row.filled,
+                seq=engine.next_seq(),
+            ))
+        if not resting and not cache_empty:
+            return book
+        return engine.publish(book)
+
+# -----------------------
+# Writes
+# -----------------------
+def _update_resting(db: Session, fills):
+    """One executemany UPDATE per side for every resting order a submit touched.
+
+    Each row is only updated if it is still open with the quantity the book
+    had for it, so two processes can't fill the same order; if any row
+    doesn't match, raises BookConflict.
+    """
+    changes = defaultdict(dict)  # side -> resting id -> [remaining before, remaining after]
+    for fill in fills:
+        resting_id = fill.sell_id if fill.resting_side == SELL else fill.buy_id
+        change = changes[fill.resting_side].setdefault(resting_id, [fill.resting_remaining + fill.quantity, 0])
+        change[1] = fill.resting_remaining  # last fill wins
+    for side, by_id in changes.items():
+        table = SIDES[side].__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.status == "open",
+                   table.c.quantity - table.c.filled == bindparam("_before"))
+            .values(
+                filled=table.c.quantity - bindparam("_remaining"),
+                status=case((bindparam("_remaining") == 0, "filled"), else_="open"),
+            )
+        )
+        rows = [{"_id": order_id, "_before": before, "_remaining": after} for order_id, (before, after) in by_id.items()]
+        if db.get_bind().dialect.supports_sane_multi_rowcount:
+            matched = db.connection().execute(statement, rows).rowcount
+        else:
+            matched = sum(db.connection().execute(statement, row).rowcount for row in rows)
+        if matched != len(rows):
+            raise BookConflict(f"resting {side} orders changed in the database")
+
+def place_order(db: Session, side: str, user_id: int, item: str, price: int, quantity: int):
+    """Insert the order, match it in memory and persist the result in one transaction.
+
+    Trades are inserted and the touched resting orders updated with
+    executemany statements, so a submit that sweeps many orders still costs
+    a fixed number of round-trips. If the write fails, the in-memory book is
+    dropped and rebuilt from the DB on next use; on a BookConflict the order
+    is placed again on the rebuilt book, up to CONFLICT_RETRIES times.
+    """
+    model = SIDES[side]
+    conflicts = 0
+    while True:
+        book = load_book(db, item)
+        with book.lock:
+            if engine.get(item) is not book:
+                continue  # dropped while we waited; use the rebuilt one
+            db_order = model(user_id=user_id, item=item, price=price, quantity=quantity, filled=0, status="open")
+            db.add(db_order)
+            try:
+                db.flush()
+                order = BookOrder(side=side, id=db_order.id, user_id=user_id, price=price,
+                                  remaining=quantity, seq=engine.next_seq())
+                fills = book.submit(order)
+                db_order.filled = quantity - order.remaining
+                db_order.status = "open" if order.remaining else "filled"
+                if fills:
+                    db.execute(insert(Trade), [
+                        {"item": item, "buy_order_id": f.buy_id, "sell_order_id": f.sell_id,
+                         "price": f.price, "quantity": f.quantity}
+                        for f in fills
+                    ])
+                    _update_resting(db, fills)
+                db.commit()
+            except BookConflict:
+                db.rollback()
+                engine.drop(item)
+                conflicts += 1
+                if conflicts > CONFLICT_RETRIES:
+                    raise
+                continue
+            except Exception:
+                db.rollback()
+                engine.drop(item)
+                raise
+            return db_order, fills
+
+def cancel_order(db: Session, side: str, db_order) -> bool:
+    """Cancel an open order; False if it already traded out or was cancelled."""
+    while True:
+        book = load_book(db, db_order.item)
+        with book.lock:
+            if engine.get(db_order.item) is not book:
+                continue
+            db.refresh(db_order)  # re-read under the book lock: a match may have just filled it
+            if db_order.status != "open":
+                return False
+            table = SIDES[side].__table__
+            try:
+                # conditional, like _update_resting: another process may fill it meanwhile
+                cancelled = db.execute(
+                    update(table)
+                    .where(table.c.id == db_order.id, table.c.status == "open", table.c.filled == db_order.filled)
+                    .values(status="cancelled")
+                ).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                engine.drop(db_order.item)
+                raise
+            if not cancelled:
+                engine.drop(db_order.item)  # the book missed that change
+                db.refresh(db_order)
+                return False
+            book.cancel(side, db_order.id)
+            set_committed_value(db_order, "status", "cancelled")
+            return True
+
+def book_depth(db: Session, item: str, levels: int = 10) -> dict:
+    book = load_book(db, item, cache_empty=False)
+    with book.lock:
+        return book.depth(levels)
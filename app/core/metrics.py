@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Off by default. When off, no middleware or engine listeners are installed and
+# timed() returns a shared no-op context manager.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# -----------------------
+# Per-request timing
+# -----------------------
+class RequestTiming:
+    __slots__ = ("sql_count", "sql_seconds", "slowest_sql_seconds", "spans")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.slowest_sql_seconds = 0.0
+        self.spans = {}
+
+# Holds a mutable RequestTiming; the threadpool copies the context, so sync
+# routes and dependencies update the same object as the middleware reads.
+_current = ContextVar("request_timing", default=None)
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        timing = _current.get()
+        if timing is not None:
+            timing.spans[self.name] = timing.spans.get(self.name, 0.0) + time.perf_counter() - self.start
+
+class _NoSpan:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+def timed(name: str):
+    """Attribute the enclosed block's wall time to `name` in Server-Timing."""
+    return _Span(name) if METRICS_ENABLED else _NO_SPAN
+
+# -----------------------
+# SQL hooks
+# -----------------------
+def install_sql_hooks(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        timing = _current.get()
+        if timing is not None:
+            timing.sql_count += 1
+            timing.sql_seconds += elapsed
+            if elapsed > timing.slowest_sql_seconds:
+                timing.slowest_sql_seconds = elapsed
+
+# -----------------------
+# Aggregates (Prometheus text format)
+# -----------------------
+class RouteStats:
+    __slots__ = ("count", "seconds", "buckets", "sql_count", "sql_seconds", "slowest_sql_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.slowest_sql_seconds = 0.0
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._counters = {}
+        self._gauges = []  # (name, help, callable returning {labels_tuple_or_None: value})
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, timing: RequestTiming):
+        key = (method, route, str(status))
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.sql_count += timing.sql_count
+            stats.sql_seconds += timing.sql_seconds
+            stats.slowest_sql_seconds = max(stats.slowest_sql_seconds, timing.slowest_sql_seconds)
+
+    def incr(self, name: str, amount: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauges(self, prefix: str, collect):
+        """`collect()` returns a flat dict of numeric values, exported as `<prefix>_<key>`."""
+        self._gauges.append((prefix, collect))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            routes = list(self._routes.items())
+            counters = list(self._counters.items())
+
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route, status), stats in routes:
+            labels = f'method="{method}",route="{route}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.seconds:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+        for name, attr, fmt in (
+            ("http_request_sql_statements_total", "sql_count", "{}"),
+            ("http_request_sql_seconds_total", "sql_seconds", "{:.6f}"),
+            ("http_request_slowest_sql_seconds", "slowest_sql_seconds", "{:.6f}"),
+        ):
+            lines.append(f"# TYPE {name} {'gauge' if 'slowest' in name else 'counter'}")
+            for (method, route, status), stats in routes:
+                value = fmt.format(getattr(stats, attr))
+                lines.append(f'{name}{{method="{method}",route="{route}",status="{status}"}} {value}')
+
+        for (name, labels), value in sorted(counters):
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        for prefix, collect in self._gauges:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# -----------------------
+# Middleware
+# -----------------------
+def route_label(scope) -> str:
+    """The matched route's full path template, e.g. "/buy/orders/{order_id}".
+
+    Routes of an included router may carry only their local path ("/orders"),
+    so the router prefix is taken from the request path: it is everything
+    before the segments the template matched.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    if ":path}" in template:  # matches a variable number of segments
+        return template
+    depth = template.rstrip("/").count("/")
+    segments = scope["path"].rstrip("/").split("/")
+    prefix = "/".join(segments[:len(segments) - depth]) if depth else "/".join(segments)
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: times each request, adds a Server-Timing header and
+    records per-route aggregates for /metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = (time.perf_counter() - start) * 1000
+                parts = [f"total;dur={total:.1f}", f'db;dur={timing.sql_seconds * 1000:.1f};desc="{timing.sql_count} queries"']
+                if timing.sql_count:
+                    parts.append(f"db-slowest;dur={timing.slowest_sql_seconds * 1000:.1f}")
+                parts.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timing.spans.items())
+                message["headers"] = [*message.get("headers", []), (b"server-timing", ", ".join(parts).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            registry.observe_request(scope["method"], route_label(scope), status, time.perf_counter() - start, timing)
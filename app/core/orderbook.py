@@ -0,0 +1,184 @@
+"""In-memory price-time priority order books.
+
+Pure data structures, no DB access: app/core/market.py loads books from the
+order tables and persists what the engine produces. Prices are integers in
+minor units (cents) so heap ordering is exact.
+
+Books live in process memory. Run the marketplace with a single worker:
+with several, each book only sees the orders its own process accepted.
+The market layer's conditional writes still refuse to fill an order twice.
+"""
+import heapq
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+BUY = "buy"
+SELL = "sell"
+
+
+@dataclass(eq=False)
+class BookOrder:
+    side: str
+    id: int
+    user_id: int
+    price: int
+    remaining: int
+    seq: int = 0
+    active: bool = True
+
+
+@dataclass(frozen=True)
+class Fill:
+    buy_id: int
+    sell_id: int
+    price: int
+    quantity: int
+    resting_side: str
+    resting_remaining: int  # the resting order's quantity left after this fill
+
+
+@dataclass
+class OrderBook:
+    """One item's book. Bids are a max-heap on price, asks a min-heap; ties go to
+    the lower sequence number (earlier order). Cancelled or filled orders are
+    removed lazily when they reach the top of a heap, so submit and cancel are
+    both O(log n) amortized."""
+
+    item: str
+    bids: List[Tuple[int, int, BookOrder]] = field(default_factory=list)
+    asks: List[Tuple[int, int, BookOrder]] = field(default_factory=list)
+    orders: Dict[Tuple[str, int], BookOrder] = field(default_factory=dict)
+    lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def _heap(self, side: str):
+        return self.bids if side == BUY else self.asks
+
+    def _push(self, order: BookOrder):
+        key = -order.price if order.side == BUY else order.price
+        heapq.heappush(self._heap(order.side), (key, order.seq, order))
+        self.orders[(order.side, order.id)] = order
+
+    def _best(self, side: str) -> Optional[BookOrder]:
+        heap = self._heap(side)
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def best_bid(self) -> Optional[BookOrder]:
+        return self._best(BUY)
+
+    def best_ask(self) -> Optional[BookOrder]:
+        return self._best(SELL)
+
+    def add_resting(self, order: BookOrder):
+        """Place an order without matching (used when rebuilding from the DB)."""
+        self._push(order)
+
+    def submit(self, order: BookOrder) -> List[Fill]:
+        """Match `order` against the opposite side, then rest any remainder.
+
+        Trades execute at the resting order's price. The returned fills tell
+        the caller which orders changed; their `remaining` is already updated.
+        """
+        fills = []
+        opposite = SELL if order.side == BUY else BUY
+        while order.remaining:
+            best = self._best(opposite)
+            if best is None:
+                break
+            if order.side == BUY and best.price > order.price:
+                break
+            if order.side == SELL and best.price < order.price:
+                break
+            quantity = min(order.remaining, best.remaining)
+            order.remaining -= quantity
+            best.remaining -= quantity
+            buy_id, sell_id = (order.id, best.id) if order.side == BUY else (best.id, order.id)
+            fills.append(Fill(buy_id, sell_id, best.price, quantity, best.side, best.remaining))
+            if not best.remaining:
+                self._remove(best)
+        if order.remaining:
+            self._push(order)
+        return fills
+
+    def cancel(self, side: str, order_id: int) -> bool:
+        order = self.orders.get((side, order_id))
+        if order is None:
+            return False
+        self._remove(order)
+        return True
+
+    def _remove(self, order: BookOrder):
+        order.active = False
+        self.orders.pop((order.side, order.id), None)
+
+    def depth(self, levels: int = 10) -> dict:
+        """Aggregated quantity per price level, best first."""
+        def aggregate(side):
+            totals = {}
+            for order in self.orders.values():
+                if order.side == side:
+                    totals[order.price] = totals.get(order.price, 0) + order.remaining
+            prices = sorted(totals, reverse=(side == BUY))[:levels]
+            return [{"price": price, "quantity": totals[price]} for price in prices]
+        return {"item": self.item, "bids": aggregate(BUY), "asks": aggregate(SELL)}
+
+
+MARKET_MAX_BOOKS = int(os.getenv("MARKET_MAX_BOOKS", "10000"))
+
+
+class OrderBookEngine:
+    """Loaded books by item. Past `max_books` the least recently used idle books
+    are evicted; they are rebuilt from the DB on next use."""
+
+    def __init__(self, max_books: int = MARKET_MAX_BOOKS):
+        self.max_books = max_books
+        self._books: "OrderedDict[str, OrderBook]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def __len__(self):
+        return len(self._books)
+
+    def next_seq(self) -> int:
+        return next(self._seq)
+
+    def get(self, item: str) -> Optional[OrderBook]:
+        with self._lock:
+            book = self._books.get(item)
+            if book is not None:
+                self._books.move_to_end(item)
+            return book
+
+    def publish(self, book: OrderBook) -> OrderBook:
+        """Install a fully loaded book unless another thread got there first."""
+        with self._lock:
+            book = self._books.setdefault(book.item, book)
+            if len(self._books) > self.max_books:
+                self._evict(keep=book)
+            return book
+
+    def _evict(self, keep: OrderBook):
+        # a book whose lock is held is mid-write; skip it rather than let a
+        # rebuild race that write. Callers re-check engine.get() under the lock.
+        for item, book in list(self._books.items()):
+            if len(self._books) <= self.max_books:
+                return
+            if book is keep or not book.lock.acquire(blocking=False):
+                continue
+            try:
+                del self._books[item]
+            finally:
+                book.lock.release()
+
+    def drop(self, item: str):
+        """Forget a book (e.g. after a failed write) so it is rebuilt from the DB."""
+        with self._lock:
+            self._books.pop(item, None)
+
+
+engine = OrderBookEngine()
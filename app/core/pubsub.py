@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from collections import deque, namedtuple
+from typing import Callable, Optional
+
+# topic narrows who may see an event (e.g. a group id); None means everyone
+Event = namedtuple("Event", "seq type data topic")
+
+# markers yielded by Broker.stream besides events
+HEARTBEAT = "heartbeat"
+RESET = "reset"
+
+
+class Subscription:
+    def __init__(self, accept: Callable[[Event], bool], maxsize: int):
+        self.accept = accept
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    # runs on the subscriber's loop
+    def deliver(self, event: Event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+    """In-process fan-out of events to async subscribers.
+
+    Every event gets the next sequence number and goes into a ring buffer of
+    the last `buffer_size` events, so a subscriber can resume after its last
+    seen id. Each subscriber has its own bounded queue; a subscriber that
+    falls behind by more than `subscriber_buffer` events is caught up from the
+    ring buffer, or told to RESET when the events it missed have been dropped.
+    `publish` may be called from any thread.
+
+    Ids are "<epoch>-<seq>": ids from before a restart don't resume, they RESET.
+    Events are per process, so each worker only sees its own writes.
+    """
+
+    def __init__(self, buffer_size: int = 1000, subscriber_buffer: int = 100):
+        self.epoch = format(int(time.time() * 1000), "x")
+        self.subscriber_buffer = subscriber_buffer
+        self._seq = 0
+        self._ring = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def event_id(self, event: Event) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        """The sequence number of one of our ids; None for no id, -1 for a foreign or stale one."""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.strip().rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return -1
+        return int(seq)
+
+    def publish(self, type: str, data, topic=None) -> Event:
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, type, data, topic)
+            self._ring.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.accept(event):
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+        return event
+
+    def _backlog(self, subscription: Subscription, after: int):
+        """(events to replay, gap, new last seq); call with the lock held.
+
+        On a gap nothing is replayed: the client resyncs and continues from now.
+        """
+        if after < 0 or after > self._seq or (self._ring and self._ring[0].seq > after + 1):
+            return [], True, self._seq
+        return [event for event in self._ring if event.seq > after and subscription.accept(event)], False, after
+
+    async def stream(self, accept: Callable[[Event], bool], after: Optional[int] = None, heartbeat: float = 15.0):
+        """Yield events (and HEARTBEAT / RESET markers) until the consumer stops iterating.
+
+        `after` is the last sequence number the client saw (see parse_id); None
+        starts with live events only.
+        """
+        subscription = Subscription(accept, self.subscriber_buffer)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if after is None:
+                backlog, gap, last = [], False, self._seq
+            else:
+                backlog, gap, last = self._backlog(subscription, after)
+        try:
+            while True:
+                if gap:
+                    yield RESET
+                for event in backlog:
+                    yield event
+                    last = event.seq
+                backlog, gap = [], False
+                if subscription.overflowed:
+                    # fell behind: drop the queue and catch up from the ring buffer
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    with self._lock:
+                        subscription.overflowed = False
+                        backlog, gap, last = self._backlog(subscription, last)
+                    continue
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if event.seq > last:
+                    yield event
+                    last = event.seq
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscription)
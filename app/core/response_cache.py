@@ -0,0 +1,81 @@
+import hashlib
+import os
+import threading
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 prescribes for If-None-Match
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+class ResponseCache:
+    """Rendered response bodies keyed by namespace version + request key.
+
+    Writers bump a namespace's version instead of deleting entries: keys
+    built with the old version simply stop being looked up and age out of
+    the LRU. Versions are per process, so other workers still serve their
+    own cached copy for up to `ttl` seconds after a write.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = {}
+        self._watched = {}  # mapped class -> namespace
+        self._lock = threading.Lock()
+
+    def key(self, namespace: str, *parts) -> tuple:
+        return (namespace, self._versions.get(namespace, 0), *parts)
+
+    def get(self, key: tuple):
+        return self.entries.get(key)
+
+    def set(self, key: tuple, value):
+        self.entries.set(key, value)
+
+    def bump(self, namespace: str):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def invalidate_on_commit(self, namespace: str, *mapped_classes):
+        """Bump `namespace` after any commit that inserted, changed or deleted one of `mapped_classes`."""
+        for cls in mapped_classes:
+            self._watched[cls] = namespace
+
+    def _collect(self, session, flush_context):
+        changed = session.info.setdefault("response_cache_namespaces", set())
+        for obj in chain(session.new, session.dirty, session.deleted):
+            namespace = self._watched.get(type(obj))
+            if namespace is not None:
+                changed.add(namespace)
+
+    def _after_commit(self, session):
+        for namespace in session.info.pop("response_cache_namespaces", ()):
+            self.bump(namespace)
+
+    def _after_rollback(self, session):
+        session.info.pop("response_cache_namespaces", None)
+
+
+response_cache = ResponseCache()
+
+event.listen(Session, "after_flush", response_cache._collect)
+event.listen(Session, "after_commit", response_cache._after_commit)
+event.listen(Session, "after_rollback", response_cache._after_rollback)
@@ -0,0 +1,95 @@
+import heapq
+import re
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def words(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+def trigrams(text: Optional[str]) -> set:
+    """pg_trgm style trigrams: each word padded with two leading spaces and one
+    trailing space, so short words and word prefixes still produce trigrams."""
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """In-process inverted index from trigram to document ids.
+
+    Used when the database has no full-text index. Results are ranked by the
+    share of the query's trigrams a document contains, so it also tolerates
+    typos and matches inside words. Memory grows with the indexed text; it is
+    meant for small tables and development databases.
+    """
+
+    def __init__(self, min_similarity: float = 0.5):
+        self.min_similarity = min_similarity
+        self.loaded = False
+        self._postings = {}   # trigram -> set of ids
+        self._documents = {}  # id -> frozenset of trigrams
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def load(self, documents: Iterable[Tuple[int, str]]):
+        with self._lock:
+            self.clear()
+            for doc_id, text in documents:
+                self._add(doc_id, text)
+            self.loaded = True
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self.loaded = False
+
+    def add(self, doc_id: int, text: str):
+        with self._lock:
+            self._remove(doc_id)
+            self._add(doc_id, text)
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _add(self, doc_id: int, text: str):
+        grams = frozenset(trigrams(text))
+        self._documents[doc_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def _remove(self, doc_id: int):
+        grams = self._documents.pop(doc_id, None)
+        for gram in grams or ():
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+        """[(id, score)] best first; ties go to the lower id."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            hits = Counter()
+            for gram in grams:
+                hits.update(self._postings.get(gram, ()))
+        threshold = self.min_similarity * len(grams)
+        ranked = heapq.nsmallest(
+            offset + limit,
+            ((doc_id, count / len(grams)) for doc_id, count in hits.items() if count >= threshold),
+            key=lambda hit: (-hit[1], hit[0]),
+        )
+        return ranked[offset:]
@@ -0,0 +1,18 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def rows_to_json(rows) -> bytes:
+    """Serialize SQLAlchemy Row objects straight to a JSON array of objects,
+    skipping ORM instances and Pydantic models."""
+    return dumps([row._asdict() for row in rows])
@@ -1,19 +1,366 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import hashlib
+import itertools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import List, Optional
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.elements import TextClause
 
-SQLALCHEMY_DATABASE_URL = "mysql+pymysql://root:@localhost/test_db_test"
+from app.core.cache import TTLCache
 
+load_dotenv()
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root:@localhost/test_db_test")
+
+# DB_ASYNC=1 serves the hot account routes from an AsyncEngine (see app/account/async_router.py)
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+# Pool sizing: size + max_overflow should cover the worker's threadpool (40 by default)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Keep below MySQL's wait_timeout so idle connections are replaced before the server drops them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Pre-ping costs a round-trip per checkout. With recycle set, stale connections are
+# rare, and a disconnect error invalidates the whole pool anyway (see handle_error below).
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def _async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(SQLALCHEMY_DATABASE_URL)
+
+# Read replicas for the sync sessions (comma-separated URLs; empty: everything on the primary)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")  # or least_connections
+# a replica that failed is probed again after this long
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "10"))
+# after a client's write, its reads stay on the primary this long (covers replication lag)
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+# -----------------------
+# Pool statistics
+# -----------------------
+class PoolStats:
+    # checkout wait histogram bucket upper bounds, in seconds
+    buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.disconnects = 0
+
+    def incr(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def observe_wait(self, seconds: float):
+        with self._lock:
+            self.wait_counts[bisect_left(self.buckets, seconds)] += 1
+            self.wait_sum += seconds
+            self.checkouts += 1
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "disconnects": self.disconnects,
+                "wait_seconds_sum": self.wait_sum,
+                "wait_seconds_buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.wait_counts)),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return stats
+
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.incr("timeouts")
+            raise
+        finally:
+            pool_stats.observe_wait(time.perf_counter() - start)
+
+def _pool_kwargs(url: str) -> dict:
+    # in-memory SQLite lives inside a single connection; keep SQLAlchemy's default pool
+    if url.startswith("sqlite") and url.partition("://")[2] in ("", "/:memory:"):
+        return {}
+    # aiosqlite engines use a NullPool, which takes none of the QueuePool options
+    if url.startswith("sqlite+aiosqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# -----------------------
+# Engine & sessions
+# -----------------------
 # MySQL এর জন্য connect_args বাদ দিন
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+_sync_pool_kwargs = _pool_kwargs(SQLALCHEMY_DATABASE_URL)
+if _sync_pool_kwargs:
+    _sync_pool_kwargs["poolclass"] = InstrumentedQueuePool
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **_sync_pool_kwargs)
+
+@event.listens_for(engine, "handle_error")
+def _count_disconnects(context):
+    # SQLAlchemy already invalidates the pool on a disconnect; we only count it
+    if context.is_disconnect:
+        pool_stats.incr("disconnects")
+
+# -----------------------
+# Read replicas
+# -----------------------
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.healthy = False  # probed before first use
+        self.retry_at = 0.0
+        self.reads = 0
+
+    def in_use(self) -> int:
+        pool = self.engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+class ReplicaSet:
+    """Picks a healthy replica per session: round robin or fewest checked-out connections.
+
+    A replica whose connection fails is marked down (see the handle_error hook)
+    and skipped until DB_REPLICA_RETRY_SECONDS have passed; then the next
+    session that would use it probes it with SELECT 1 first. With no healthy
+    replica, choose() returns None and reads go to the primary.
+    """
+
+    def __init__(self, engines, strategy: str = DB_REPLICA_STRATEGY, retry_seconds: float = DB_REPLICA_RETRY_SECONDS):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self.fallbacks = 0
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: Replica):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica)
+        return handle_error
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def mark_down(self, replica: Replica):
+        with self._lock:
+            replica.healthy = False
+            replica.retry_at = time.monotonic() + self.retry_seconds
+
+    def _probe(self, replica: Replica) -> bool:
+        with self._lock:
+            if replica.healthy or replica.retry_at > time.monotonic():
+                return replica.healthy
+            replica.retry_at = time.monotonic() + self.retry_seconds  # one prober at a time
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception:
+            return False
+        replica.healthy = True
+        return True
+
+    def choose(self) -> Optional[Replica]:
+        now = time.monotonic()
+        candidates = [r for r in self.replicas if r.healthy or (r.retry_at <= now and self._probe(r))]
+        if not candidates:
+            self.fallbacks += 1
+            return None
+        if self.strategy == "least_connections":
+            replica = min(candidates, key=Replica.in_use)
+        else:
+            replica = candidates[next(self._next) % len(candidates)]
+        replica.reads += 1
+        return replica
+
+    def stats(self) -> dict:
+        stats = {"healthy": sum(r.healthy for r in self.replicas), "total": len(self.replicas), "fallbacks": self.fallbacks}
+        for index, replica in enumerate(self.replicas):
+            stats[f"replica{index}_reads"] = replica.reads
+            stats[f"replica{index}_in_use"] = replica.in_use()
+        return stats
+
+class RoutingSession(Session):
+    """Session that reads from a replica and writes to the primary (its bind).
+
+    Primary: flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw text()
+    statements, sessions with info["use_primary"], and every statement after the
+    session's first write (read-your-writes, also after commit). Other reads go
+    to one replica chosen when the session first reads. A read that fails with
+    a connection error on the replica marks it down and is retried once on the
+    primary, which the rest of the session then uses.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+        self._replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self.replicas is None:
+            return primary
+        if self._flushing or _needs_primary(clause):
+            self.wrote = True
+            return primary
+        if self.wrote or self.info.get("use_primary"):
+            return primary
+        if self._replica is None:
+            self._replica = self.replicas.choose() or False
+        return self._replica.engine if self._replica else primary
+
+    def execute(self, statement, *args, **kwargs):
+        replica = self._replica
+        try:
+            return super().execute(statement, *args, **kwargs)
+        except DBAPIError as exc:
+            replica = self._replica or replica
+            if not self._retry_on_primary(replica, statement, exc):
+                raise
+        return super().execute(statement, *args, **kwargs)
+
+    def scalar(self, statement, *args, **kwargs):
+        return self.execute(statement, *args, **kwargs).scalar()
+
+    def scalars(self, statement, *args, **kwargs):
+        return self.execute(statement, *args, **kwargs).scalars()
+
+    def _retry_on_primary(self, replica, statement, exc) -> bool:
+        """After a failed statement: was it a replica read that is safe to rerun on the primary?"""
+        if not replica or self.wrote or self.info.get("use_primary") or _needs_primary(statement):
+            return False
+        if not (isinstance(exc, (OperationalError, InterfaceError)) or exc.connection_invalidated):
+            return False  # a bad statement fails on the primary too
+        if self.new or self.dirty or self.deleted:
+            return False  # rolling back would discard unflushed changes
+        self.replicas.mark_down(replica)
+        # drop the broken replica connection; nothing was written in this transaction
+        self.rollback()
+        self._replica = False
+        return True
+
+    def close(self):
+        super().close()
+        self.wrote = False
+        self._replica = None
+
+def _needs_primary(clause) -> bool:
+    if clause is None:
+        return False
+    return (
+        getattr(clause, "is_dml", False)
+        or getattr(clause, "_for_update_arg", None) is not None
+        or isinstance(clause, TextClause)  # can't tell a raw statement's intent
+    )
+
+def _make_replica_engine(url: str):
+    args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(url, connect_args=args, **_pool_kwargs(url))
+
+def make_sessionmaker(primary, replica_engines: List = (), **kwargs) -> sessionmaker:
+    """Sessions bound to `primary` that route reads across `replica_engines`."""
+    replicas = ReplicaSet(replica_engines) if replica_engines else None
+    return sessionmaker(class_=RoutingSession, replicas=replicas, bind=primary, **kwargs)
+
+def get_pool_stats() -> dict:
+    return pool_stats.snapshot(engine.pool)
+
+# expire_on_commit=False: objects keep the values they were written with, so
+# returning them after commit doesn't re-SELECT each row
+SessionLocal = make_sessionmaker(
+    engine,
+    [_make_replica_engine(url) for url in DATABASE_REPLICA_URLS],
+    autocommit=False, autoflush=False, expire_on_commit=False,
+)
+replica_set: Optional[ReplicaSet] = SessionLocal.kw["replicas"]
+# Background work that must see the latest committed data (locks, queues, revocations)
+PrimarySessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
-# Dependency
-def get_db():
+# Async engine is only built when enabled, so aiomysql/aiosqlite stay optional
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_kwargs(ASYNC_DATABASE_URL))
+    # expire_on_commit=False: expired attributes can't lazy-load under asyncio
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# -----------------------
+# Request sessions
+# -----------------------
+# Clients that wrote recently, keyed by a digest of their credentials (or address)
+recent_writers = TTLCache(maxsize=100_000, ttl=DB_READ_YOUR_WRITES_SECONDS)
+
+def _client_key(request: Request) -> str:
+    credential = request.headers.get("authorization") or (request.client.host if request.client else "")
+    return hashlib.blake2b(credential.encode(), digest_size=16).hexdigest()
+
+# Dependency. Only GET/HEAD requests read from replicas, unless the same client
+# wrote within DB_READ_YOUR_WRITES_SECONDS; everything else stays on the primary.
+def get_db(request: Request):
     db = SessionLocal()
+    key = None
+    if replica_set is not None:
+        key = _client_key(request)
+        if request.method not in ("GET", "HEAD") or recent_writers.get(key):
+            db.info["use_primary"] = True
     try:
         yield db
     finally:
+        if key is not None and db.wrote:
+            recent_writers.set(key, True)
         db.close()
+
+# For streaming responses that outlive the request's get_db session
+def get_sessionmaker():
+    return SessionLocal
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled; set DB_ASYNC=1")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,18 +1,130 @@
+import importlib.util
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 from app.account import models as account_models
-# from app.buy import models as buy_models
-# from app.sell import models as sell_models
-from app.database import engine, Base
+from app.buy import models as buy_models
+from app.sell import models as sell_models
+from app.database import engine, async_engine, replica_set, Base, DB_ASYNC, get_pool_stats
+from app.account.feed import task_feed
+from app.account.jobs import TASK_JOB_HANDLER, load_handler, task_queue
 from app.account.router import router as account_router
-# from app.buy.router import router as buy_router
-# from app.sell.router import router as sell_router
+from app.account.permissions import role_masks_cache
+from app.account.principal import principal_cache
+from app.core.hashing import bulk_password_hasher, password_hasher
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware, install_sql_hooks, registry
+from app.buy.router import router as buy_router
+from app.sell.router import router as sell_router
+
+logger = logging.getLogger(__name__)
+
+# DB_CREATE_ALL=1 creates missing tables at startup; it is the only way to build
+# a fresh schema. The Alembic chain does not run on an empty database: stamp an
+# existing one with `alembic stamp 2eb45d6b37d4` before `alembic upgrade head`.
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "0") == "1"
+# Open this many pooled connections before serving so the first requests don't pay for connects
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "0"))
+# FAST_JSON=1 renders every response with orjson (needs the orjson package)
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+
+# the work each new task triggers; registered before the lifespan starts the workers
+if TASK_JOB_HANDLER:
+    task_queue.handler = load_handler(TASK_JOB_HANDLER)
+
+if FAST_JSON and importlib.util.find_spec("orjson") is None:
+    logger.warning("FAST_JSON is set but orjson is not installed; using the default JSON encoder")
+    FAST_JSON = False
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
+def _warm_pool(count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    except Exception as exc:
+        # a DB outage must not stop the worker from starting; requests will retry
+        logger.warning("Pool warm-up stopped after %d connections: %s", len(connections), exc)
+    finally:
+        for connection in connections:
+            connection.close()
 
-app = FastAPI(title="Marketplace API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    if DB_CREATE_ALL:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    if DB_POOL_WARMUP:
+        await run_in_threadpool(_warm_pool, DB_POOL_WARMUP)
+    await task_queue.start()
+    app.state.startup_seconds = time.perf_counter() - _import_started
+    logger.info(
+        "Startup took %.3fs (import %.3fs, lifespan %.3fs)",
+        app.state.startup_seconds, started - _import_started, time.perf_counter() - started,
+    )
+    yield
+    await task_queue.stop()
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
+    engine.dispose()
+    for replica in replica_set.replicas if replica_set is not None else ():
+        replica.engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+app = FastAPI(
+    title="Marketplace API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if FAST_JSON else JSONResponse,
+)
 
 # Register routers
+if DB_ASYNC:
+    from app.account.async_router import router as async_account_router
+
+    # async routes replace their sync twins; everything else stays on the sync router
+    overridden = {(route.path, method) for route in async_account_router.routes for method in route.methods}
+    account_router.routes = [
+        route for route in account_router.routes
+        if not any((route.path, method) in overridden for method in route.methods)
+    ]
+    app.include_router(async_account_router, prefix="/account", tags=["Account"])
+
 app.include_router(account_router, prefix="/account", tags=["Account"])
-# app.include_router(buy_router, prefix="/buy", tags=["Buy"])
-# app.include_router(sell_router, prefix="/sell", tags=["Sell"])
\ No newline at end of file
+app.include_router(buy_router, prefix="/buy", tags=["Buy"])
+app.include_router(sell_router, prefix="/sell", tags=["Sell"])
+
+@app.get("/health/pool", include_in_schema=False)
+def pool_health():
+    return get_pool_stats()
+
+# Request timing, Server-Timing headers and /metrics (METRICS_ENABLED=1)
+if METRICS_ENABLED:
+    install_sql_hooks(engine)
+    if async_engine is not None:
+        install_sql_hooks(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+    registry.register_gauges("db_pool", get_pool_stats)
+    registry.register_gauges("password_hash", password_hasher.stats)
+    if replica_set is not None:
+        registry.register_gauges("db_replicas", replica_set.stats)
+    registry.register_gauges("cache", lambda: {
+        "principal_entries": len(principal_cache),
+        "role_masks_entries": len(role_masks_cache),
+    })
+    if task_queue.enabled:
+        registry.register_gauges("task_jobs", task_queue.stats)
+    registry.register_gauges("task_feed", lambda: {"subscribers": len(task_feed)})
+    registry.register_gauges("app", lambda: {"startup_seconds": getattr(app.state, "startup_seconds", 0.0)})
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
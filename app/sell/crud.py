@@ -0,0 +1,27 @@
+from sqlalchemy.orm import Session
+from app.sell import models, schemas
+from app.buy.crud import fill_responses
+from app.core import market
+from app.core.orderbook import SELL
+
+def place_sell_order(db: Session, user_id: int, order: schemas.SellOrderCreate):
+    db_order, fills = market.place_order(db, SELL, user_id, order.item, order.price, order.quantity)
+    return {"order": db_order, "fills": fill_responses(fills)}
+
+def get_sell_order(db: Session, order_id: int):
+    return db.get(models.SellOrder, order_id)
+
+def list_sell_orders(db: Session, user_id: int, limit: int):
+    return (
+        db.query(models.SellOrder)
+        .filter(models.SellOrder.user_id == user_id)
+        .order_by(models.SellOrder.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+def cancel_sell_order(db: Session, db_order: models.SellOrder) -> bool:
+    return market.cancel_order(db, SELL, db_order)
+
+def get_book(db: Session, item: str, levels: int):
+    return market.book_depth(db, item, levels)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+# -----------------
+# Sell orders (asks)
+# -----------------
+# price is in minor units (cents); filled counts the quantity already traded
+class SellOrder(Base):
+    __tablename__ = "sell_orders"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    item = Column(String(50), nullable=False)
+    price = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    filled = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="open")  # open, filled, cancelled
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_sell_orders_item_status", "item", "status"),)
+
+# -----------------
+# Trades (a buy order matched against a sell order)
+# -----------------
+class Trade(Base):
+    __tablename__ = "trades"
+    id = Column(Integer, primary_key=True)
+    item = Column(String(50), nullable=False, index=True)
+    buy_order_id = Column(Integer, ForeignKey("buy_orders.id"), nullable=False, index=True)
+    sell_order_id = Column(Integer, ForeignKey("sell_orders.id"), nullable=False, index=True)
+    price = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
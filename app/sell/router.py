@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.market import BookConflict
+from app.database import get_db
+from app.sell import crud, schemas
+from app.account.principal import Principal
+from app.account.router import get_current_user
+
+router = APIRouter()
+
+# -----------------------
+# Sell orders
+# -----------------------
+@router.post("/orders", response_model=schemas.SellOrderPlaced)
+def place_sell_order(
+    order: schemas.SellOrderCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        return crud.place_sell_order(db, current_user.id, order)
+    except BookConflict:
+        raise HTTPException(status_code=409, detail="The order book changed while placing the order, try again")
+
+@router.get("/orders", response_model=list[schemas.SellOrderResponse])
+def list_my_sell_orders(
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return crud.list_sell_orders(db, current_user.id, limit)
+
+@router.get("/orders/{order_id}", response_model=schemas.SellOrderResponse)
+def get_sell_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    db_order = crud.get_sell_order(db, order_id)
+    if not db_order or db_order.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return db_order
+
+@router.delete("/orders/{order_id}", response_model=schemas.SellOrderResponse)
+def cancel_sell_order(
+    order_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    db_order = crud.get_sell_order(db, order_id)
+    if not db_order or db_order.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if not crud.cancel_sell_order(db, db_order):
+        raise HTTPException(status_code=400, detail=f"Order is already {db_order.status}")
+    return db_order
+
+# -----------------------
+# Order book (both sides)
+# -----------------------
+@router.get("/book/{item}", response_model=schemas.BookResponse)
+def get_book(
+    item: str,
+    levels: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return crud.get_book(db, item, levels)
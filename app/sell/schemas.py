@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+from app.buy.schemas import FillResponse
+
+# price sob somoy minor unit e (cents), tai int
+class SellOrderCreate(BaseModel):
+    item: str = Field(min_length=1, max_length=50)
+    price: int = Field(gt=0)
+    quantity: int = Field(gt=0)
+
+class SellOrderResponse(BaseModel):
+    id: int
+    user_id: int
+    item: str
+    price: int
+    quantity: int
+    filled: int
+    status: str
+    created_at: datetime
+    model_config = {"from_attributes": True}
+
+class SellOrderPlaced(BaseModel):
+    order: SellOrderResponse
+    fills: List[FillResponse] = []
+
+class BookLevel(BaseModel):
+    price: int
+    quantity: int
+
+class BookResponse(BaseModel):
+    item: str
+    bids: List[BookLevel] = []
+    asks: List[BookLevel] = []
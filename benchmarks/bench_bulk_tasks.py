@@ -0,0 +1,69 @@
+"""Creating and re-assigning many tasks: one request per task vs the bulk endpoints.
+
+    python -m benchmarks.bench_bulk_tasks --tasks 5000
+
+Reports wall time and SQL statements for each approach against an
+in-memory SQLite database.
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from app.account import models
+from benchmarks.common import count_queries, make_app, seed_superadmin
+
+
+def timed(engine, label: str, fn):
+    with count_queries(engine) as statements:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    print(f"{label:28} {elapsed:8.2f} s  {len(statements):7} SQL statements")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=10)
+    args = parser.parse_args()
+
+    app, Session = make_app()
+    engine = Session.kw["bind"]
+    token = seed_superadmin(Session)
+    db = Session()
+    db.add_all(models.Group(name=f"group-{i}") for i in range(args.groups))
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    tasks = [{"title": f"task {i}", "description": "bench", "assigned_group_id": i % args.groups + 1}
+             for i in range(args.tasks)]
+
+    def one_by_one_create():
+        for task in tasks:
+            assert client.post("/account/tasks", json=task, headers=headers).status_code == 200
+
+    def bulk_create():
+        response = client.post("/account/tasks/bulk", json=tasks, headers=headers)
+        assert response.json()["failed"] == 0, response.text
+
+    def one_by_one_update():
+        for task_id in range(1, args.tasks + 1):
+            task = {"title": f"task {task_id}", "assigned_group_id": task_id % args.groups + 1}
+            assert client.put(f"/account/tasks/{task_id}", json=task, headers=headers).status_code == 200
+
+    def bulk_update():
+        patches = [{"id": task_id, "assigned_group_id": (task_id + 1) % args.groups + 1}
+                   for task_id in range(args.tasks + 1, 2 * args.tasks + 1)]
+        response = client.patch("/account/tasks/bulk", json=patches, headers=headers)
+        assert response.json()["failed"] == 0, response.text
+
+    timed(engine, "create, one request each", one_by_one_create)
+    timed(engine, "create, POST /tasks/bulk", bulk_create)
+    timed(engine, "update, one request each", one_by_one_update)
+    timed(engine, "update, PATCH /tasks/bulk", bulk_update)
+
+
+if __name__ == "__main__":
+    main()
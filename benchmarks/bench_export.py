@@ -0,0 +1,85 @@
+"""Peak RSS while streaming a large task export.
+
+    python -m benchmarks.bench_export --rows 1000000 --format ndjson
+
+Seeds a temporary SQLite file, then runs each export in a fresh child
+process and reports that process's peak RSS. "materialized" loads every
+row into one JSON body the way list endpoints do, for contrast.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+
+from app.database import Base
+from app.account import models
+
+
+def seed(path: str, rows: int, chunk: int = 50_000):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Group), [{"id": 1, "name": "export-group"}])
+        for start in range(0, rows, chunk):
+            conn.execute(insert(models.Task), [
+                {"title": f"task {i}", "description": f"description for task {i}",
+                 "assigned_group_id": 1, "status": "pending"}
+                for i in range(start, min(start + chunk, rows))
+            ])
+    engine.dispose()
+
+
+def export(path: str, mode: str):
+    from fastapi.testclient import TestClient
+    from benchmarks.common import make_app, seed_superadmin
+
+    app, Session = make_app(f"sqlite:///{path}")
+    token = seed_superadmin(Session, username=f"export_admin_{os.getpid()}", permissions=("view_task",))
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    start = time.perf_counter()
+    size = 0
+    if mode == "materialized":
+        db = Session()
+        rows = [{"id": t.id, "title": t.title, "description": t.description,
+                 "assigned_group_id": t.assigned_group_id, "status": t.status}
+                for t in db.query(models.Task).all()]
+        size = len(json.dumps(rows))
+        db.close()
+    else:
+        with client.stream("GET", f"/account/export/tasks?format={mode}", headers=headers) as response:
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "bytes": size, "seconds": round(elapsed, 2), "peak_rss_mb": round(peak_mb, 1)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", default="ndjson,csv,materialized")
+    parser.add_argument("--child", nargs=2, metavar=("DB_PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        export(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.db")
+        seed(path, args.rows)
+        print(f"{args.rows} tasks seeded")
+        for mode in args.modes.split(","):
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_export", "--child", path, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Login latency under concurrency: inline bcrypt vs the password_hasher pool.
+
+    python -m benchmarks.bench_login --concurrency 50 --requests 400
+
+"before" is the old synchronous handler (bcrypt inside the request thread),
+"after" is POST /account/login as shipped.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date
+
+import httpx
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.account import models
+from app.account.router import get_user_by_username
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token, hash_password, verify_password
+from benchmarks.common import make_app
+
+PASSWORD = "bench-password"
+
+
+def add_baseline_route(app):
+    @app.post("/baseline/login")
+    def baseline_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+        user = get_user_by_username(db, form_data.username)
+        if not user or not verify_password(form_data.password, user.password):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        return {"access_token": create_access_token(data={"sub": user.username}), "token_type": "bearer"}
+
+
+async def run(app, url: str, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    form = {"username": "bench_user", "password": PASSWORD}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(url, data=form)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    app, Session = make_app()
+    add_baseline_route(app)
+    db = Session()
+    db.add(models.User(
+        username="bench_user",
+        email="bench_user@example.com",
+        password=hash_password(PASSWORD),
+        birthdate=date(1990, 1, 1),
+    ))
+    db.commit()
+    db.close()
+
+    for label, url in (("before", "/baseline/login"), ("after", "/account/login")):
+        result = asyncio.run(run(app, url, args.requests, args.concurrency))
+        print(
+            f"{label:6}  {result['rps']:7.1f} req/s  p50 {result['p50_ms']:8.1f} ms  "
+            f"p99 {result['p99_ms']:8.1f} ms  statuses {result['statuses']}"
+        )
+    print("hasher:", password_hasher.stats())
+
+
+if __name__ == "__main__":
+    main()
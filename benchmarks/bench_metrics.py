@@ -0,0 +1,43 @@
+"""Metrics middleware overhead and route labels.
+
+    python -m benchmarks.bench_metrics --requests 2000
+
+Boots app.main with METRICS_ENABLED=1 against a throwaway SQLite file.
+Checks that routes with the same local path under different routers
+(/buy/orders and /sell/orders) get separate /metrics series, then reports
+the requests/s of a cheap endpoint with the middleware on.
+"""
+import argparse
+import os
+import tempfile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="metrics-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'metrics.db')}"
+    os.environ["DB_CREATE_ALL"] = "1"
+    os.environ["METRICS_ENABLED"] = "1"
+
+    from fastapi.testclient import TestClient
+    from app.database import PrimarySessionLocal
+    from app.main import app
+    from benchmarks.common import measure_rps, seed_superadmin
+
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {seed_superadmin(PrimarySessionLocal)}"}
+        for url in ("/buy/orders", "/sell/orders", "/buy/orders/1", "/sell/orders/1"):
+            client.get(url, headers=headers)
+        metrics = client.get("/metrics").text
+        for route in ("/buy/orders", "/sell/orders", "/buy/orders/{order_id}", "/sell/orders/{order_id}"):
+            assert f'route="{route}"' in metrics, f"no series for {route}"
+        print("route labels: separate series for /buy/orders, /sell/orders and their {order_id} routes")
+        rps = measure_rps(client, "GET", "/health/pool", args.requests)
+    print(f"GET /health/pool with metrics: {rps:,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
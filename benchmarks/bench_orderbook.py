@@ -0,0 +1,49 @@
+"""Matching throughput of the in-memory order book engine (no DB).
+
+    python -m benchmarks.bench_orderbook --orders 500000
+
+Random limit orders around a drifting mid price, so the book holds a deep
+resting population while a steady share of orders cross and match.
+"""
+import argparse
+import random
+import time
+
+from app.core.orderbook import BUY, SELL, BookOrder, OrderBook
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--cancel-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    book = OrderBook(item="bench")
+    orders = []
+    mid = 10_000
+    for i in range(args.orders):
+        mid += rng.choice((-1, 0, 1))
+        side = BUY if rng.random() < 0.5 else SELL
+        offset = int(rng.gauss(0, 25))
+        price = max(1, mid - offset if side == BUY else mid + offset)
+        orders.append(BookOrder(side=side, id=i, user_id=i % 1000, price=price,
+                                remaining=rng.randint(1, 100), seq=i))
+
+    fills = cancels = 0
+    start = time.perf_counter()
+    for order in orders:
+        fills += len(book.submit(order))
+        if rng.random() < args.cancel_ratio:
+            victim = orders[rng.randrange(order.id + 1)]
+            cancels += book.cancel(victim.side, victim.id)
+    elapsed = time.perf_counter() - start
+
+    print(f"orders submitted: {args.orders}  fills: {fills}  cancels: {cancels}  resting: {len(book.orders)}")
+    print(f"{args.orders / elapsed:,.0f} orders/s   {fills / elapsed:,.0f} matches/s   "
+          f"{elapsed / args.orders * 1e6:.2f} us/order")
+
+
+if __name__ == "__main__":
+    main()
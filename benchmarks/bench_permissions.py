@@ -0,0 +1,45 @@
+"""Requests/sec on GET /account/tasks with and without the principal/permission caches.
+
+"without" loads the user and the role's permissions from the DB on every
+request; "with" answers the permission check from the principal's cached mask.
+
+    python -m benchmarks.bench_permissions --requests 2000
+"""
+import argparse
+
+from fastapi.testclient import TestClient
+
+from app.account.permissions import role_masks_cache
+from app.account.principal import principal_cache
+from benchmarks.common import make_app, measure_rps, seed_superadmin, seed_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20)
+    args = parser.parse_args()
+
+    app, Session = make_app()
+    token = seed_superadmin(Session)
+    seed_tasks(Session, args.tasks)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    caches = (role_masks_cache, principal_cache)
+    ttls = [cache.ttl for cache in caches]
+    for cache in caches:
+        cache.ttl = 0
+        cache.clear()
+    uncached = measure_rps(client, "GET", "/account/tasks", args.requests, headers=headers)
+
+    for cache, ttl in zip(caches, ttls):
+        cache.ttl = ttl
+    cached = measure_rps(client, "GET", "/account/tasks", args.requests, headers=headers)
+
+    print(f"GET /account/tasks  without cache: {uncached:8.1f} req/s")
+    print(f"GET /account/tasks  with cache:    {cached:8.1f} req/s  ({cached / uncached:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Read routing across SQLite "replicas".
+
+    python -m benchmarks.bench_replicas --requests 300
+
+Seeds a primary SQLite file, copies it to two replica files and adds a
+third replica URL that can't be opened, then boots app.main with
+DATABASE_REPLICA_URLS pointing at them. The copies never replicate, which
+makes routing visible: a task created through the API exists only on the
+primary, so reading it back shows where each read went.
+
+Reports how GET /account/tasks reads spread over the replicas, that the
+broken replica is skipped, and read-your-writes after a POST.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--strategy", default="round_robin", choices=["round_robin", "least_connections"])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="replicas-")
+    primary = os.path.join(workdir, "primary.db")
+    replicas = [os.path.join(workdir, f"replica{i}.db") for i in range(2)]
+    os.environ["DATABASE_URL"] = f"sqlite:///{primary}"
+    os.environ["DATABASE_REPLICA_URLS"] = ",".join(
+        [f"sqlite:///{path}" for path in replicas] + [f"sqlite:///{workdir}/missing/dir/replica.db"]
+    )
+    os.environ["DB_REPLICA_STRATEGY"] = args.strategy
+    os.environ["DB_READ_YOUR_WRITES_SECONDS"] = "1"
+    os.environ["RESPONSE_CACHE_TTL"] = "0"  # every GET must reach a database
+
+    from fastapi.testclient import TestClient
+    from app.database import Base, PrimarySessionLocal, engine, replica_set
+    from app.main import app
+    from benchmarks.common import seed_superadmin, seed_tasks
+
+    Base.metadata.create_all(bind=engine)
+    token = seed_superadmin(PrimarySessionLocal)
+    seed_tasks(PrimarySessionLocal, 1000)
+    engine.dispose()
+    for path in replicas:
+        shutil.copyfile(primary, path)
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    start = time.perf_counter()
+    for i in range(args.requests):
+        response = client.get(f"/account/tasks?after={i}&limit=10", headers=headers)
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - start
+    print(f"{args.requests} reads in {elapsed:.2f}s with {args.strategy}: {replica_set.stats()}")
+
+    created = client.post("/account/tasks", headers=headers, json={"title": "written to the primary"}).json()
+    def sees_new_task():
+        page = client.get(f"/account/tasks?after={created['id'] - 1}&limit=1", headers=headers).json()
+        return bool(page) and page[0]["id"] == created["id"]
+    print(f"read right after the write sees task {created['id']}: {sees_new_task()}  (primary)")
+    time.sleep(1.1)
+    print(f"read after the read-your-writes window sees it: {sees_new_task()}  (replica, never replicated)")
+
+
+if __name__ == "__main__":
+    main()
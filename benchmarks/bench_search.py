@@ -0,0 +1,110 @@
+"""Task and user search latency against a large SQLite table.
+
+    python -m benchmarks.bench_search --rows 1000000
+
+Seeds a temporary SQLite file (the FTS5 index is filled by its triggers),
+then times each query through app.account.search with the FTS5 backend,
+the in-process trigram index, and a LIKE '%term%' scan for contrast.
+The trigram index holds every task in memory; use --skip-memory on
+machines without a few GB to spare.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.account import models, search
+from app.account.crud import TASK_RESPONSE_COLUMNS
+from benchmarks.common import DUMMY_HASH
+
+VOCABULARY = (
+    "deploy login invoice report migrate backup review refactor cache search "
+    "payment export import billing onboarding dashboard release hotfix audit sync"
+).split()
+QUERIES = ("deploy", "invoice report", "migr", "hotfix audit", "dashbord")
+
+
+def seed(path: str, rows: int, users: int, chunk: int = 50_000):
+    rng = random.Random(7)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Group), [{"id": 1, "name": "search-group"}])
+        for start in range(0, rows, chunk):
+            conn.execute(insert(models.Task), [
+                {"title": " ".join(rng.sample(VOCABULARY, 3)) + f" {i}",
+                 "description": " ".join(rng.sample(VOCABULARY, 6)),
+                 "assigned_group_id": 1, "status": "pending"}
+                for i in range(start, min(start + chunk, rows))
+            ])
+        conn.execute(insert(models.User), [
+            {"username": f"user{i:07d}", "email": f"u{i:07d}@example.com", "password": DUMMY_HASH,
+             "role": models.UserRole.user}
+            for i in range(users)
+        ])
+    return engine
+
+
+def timed_ms(fn, repeat: int):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def like_scan(db, q: str, limit: int):
+    conditions = [or_(models.Task.title.like(f"%{word}%"), models.Task.description.like(f"%{word}%"))
+                  for word in q.split()]
+    return db.execute(select(*TASK_RESPONSE_COLUMNS).where(*conditions).order_by(models.Task.id).limit(limit)).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-memory", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        engine = seed(os.path.join(tmp, "search.db"), args.rows, args.users)
+        print(f"{args.rows} tasks / {args.users} users seeded in {time.perf_counter() - start:.1f}s")
+        db = sessionmaker(bind=engine)()
+
+        backends = ["fts5"] + ([] if args.skip_memory else ["memory"])
+        if "memory" in backends:
+            start = time.perf_counter()
+            search._load_task_index(db)
+            print(f"trigram index: {len(search.task_index)} tasks loaded in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<16}" + "".join(f"{name:>12}" for name in backends + ["like scan"]) + "   (ms per query, hits)")
+        for q in QUERIES:
+            cells = []
+            for backend in backends:
+                search._backends[engine] = backend
+                ms, (rows, _) = timed_ms(lambda: search.search_tasks(db, q, args.limit), args.repeat)
+                cells.append(f"{ms:>8.2f} {len(rows):>3}")
+            ms, rows = timed_ms(lambda: like_scan(db, q, args.limit), max(1, args.repeat // 10))
+            cells.append(f"{ms:>8.2f} {len(rows):>3}")
+            print(f"{q:<16}" + "".join(cells))
+
+        for prefix in ("user00012", "u0000"):
+            ms, (rows, _) = timed_ms(lambda: search.search_users(db, prefix, args.limit), args.repeat)
+            scan_ms, _ = timed_ms(lambda: db.execute(select(models.User.id).where(
+                or_(models.User.username.like(f"%{prefix}%"), models.User.email.like(f"%{prefix}%"))
+            ).limit(args.limit)).all(), max(1, args.repeat // 10))
+            print(f"users prefix {prefix!r}: range scan {ms:.2f} ms ({len(rows)} hits), LIKE scan {scan_ms:.2f} ms")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Serialization cost per 10k tasks for the list-endpoint encoding paths.
+
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 20
+
+fastapi-default:  ORM objects -> TaskResponse models -> jsonable_encoder -> json.dumps
+                  (what a response_model list endpoint does)
+pydantic-json:    ORM objects -> TypeAdapter(list[TaskResponse]).dump_json
+rows-direct:      column rows -> dicts -> orjson (stdlib json if orjson is missing)
+
+Loading from the DB is excluded; only the encoding is timed.
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.account import crud, models, schemas
+from app.core.serialization import orjson, rows_to_json
+from benchmarks.common import make_app, seed_tasks
+
+
+def timeit(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    _, Session = make_app()
+    seed_tasks(Session, args.rows)
+    db = Session()
+    tasks = db.query(models.Task).order_by(models.Task.id).all()
+    rows = db.execute(crud.tasks_page_query(None, args.rows)).all()[:args.rows]
+    adapter = TypeAdapter(list[schemas.TaskResponse])
+
+    paths = {
+        "fastapi-default": lambda: json.dumps(jsonable_encoder(
+            [schemas.TaskResponse.model_validate(task) for task in tasks])).encode(),
+        "pydantic-json": lambda: adapter.dump_json(tasks),
+        "rows-direct": lambda: rows_to_json(rows),
+    }
+    assert json.loads(paths["fastapi-default"]()) == json.loads(paths["rows-direct"]())
+
+    scale = 10_000 / args.rows
+    print(f"encoder for rows-direct: {'orjson' if orjson else 'stdlib json'}")
+    baseline = None
+    for name, fn in paths.items():
+        seconds = timeit(fn, args.repeat) * scale
+        baseline = baseline or seconds
+        print(f"{name:16} {seconds * 1000:8.2f} ms / 10k tasks  ({baseline / seconds:5.1f}x)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Task job queue throughput through the real app lifespan.
+
+    python -m benchmarks.bench_task_jobs --tasks 5000
+
+Boots app.main against a throwaway SQLite file with the default handler
+registered, creates tasks with POST /account/tasks/bulk and waits until the
+workers have moved every one to "done". Reports jobs/s and the SQL
+statements the queue issued, which grow with batches, not with jobs.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="task-jobs-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'jobs.db')}"
+    os.environ["DB_CREATE_ALL"] = "1"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    from app.account import models
+    from app.account.jobs import task_queue
+    from app.database import PrimarySessionLocal, engine
+    from app.main import app
+    from benchmarks.common import count_queries, seed_superadmin
+
+    with TestClient(app) as client:  # runs the lifespan: tables, handler, workers
+        assert task_queue.enabled, "no task job handler registered"
+        headers = {"Authorization": f"Bearer {seed_superadmin(PrimarySessionLocal)}"}
+        with count_queries(engine) as statements:
+            start = time.perf_counter()
+            for offset in range(0, args.tasks, 1000):
+                response = client.post("/account/tasks/bulk", headers=headers, json=[
+                    {"title": f"job task {i}"} for i in range(offset, min(args.tasks, offset + 1000))
+                ])
+                assert response.status_code == 200, response.text
+            created = len(statements)
+            while time.perf_counter() - start < args.timeout:
+                db = PrimarySessionLocal()
+                try:
+                    done = db.execute(
+                        select(func.count()).select_from(models.Task).where(models.Task.status == "done")
+                    ).scalar_one()
+                finally:
+                    db.close()
+                if done == args.tasks:
+                    break
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - start
+
+    print(f"{done}/{args.tasks} tasks done in {elapsed:.2f}s  ({done / elapsed:,.0f} jobs/s)")
+    print(f"SQL statements: {created} to create, {len(statements) - created} by the queue and the polling")
+    print(task_queue.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Helpers shared by the benchmark scripts.
+
+Run benchmarks from the project root, e.g. `python -m benchmarks.bench_permissions`.
+They build the account API against an in-memory SQLite database, so no MySQL
+server is needed.
+"""
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db, get_sessionmaker
+from app.account import models
+from app.account.jobs import TASK_JOB_HANDLER, load_handler, task_queue
+from app.account.ratelimit import login_throttle, register_throttle
+from app.account.router import router as account_router
+from app.core.security import create_access_token
+
+# Seeded users never log in through bcrypt, so any placeholder hash works
+DUMMY_HASH = "$2b$12$" + "x" * 53
+
+ALL_PERMISSIONS = ("create_group", "assign_user", "create_task", "view_task", "update_task", "change_role")
+
+
+def make_app(url: str = "sqlite://", rate_limits: bool = False):
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(account_router, prefix="/account")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_sessionmaker] = lambda: Session
+    # as app.main does, so task writes enqueue their jobs (no workers run here)
+    if TASK_JOB_HANDLER and task_queue.handler is None:
+        task_queue.handler = load_handler(TASK_JOB_HANDLER)
+    if not rate_limits:
+        app.dependency_overrides[login_throttle] = lambda: None
+        app.dependency_overrides[register_throttle] = lambda: None
+    return app, Session
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def count_queries(engine, limit: int = None, label: str = "block"):
+    """Count SQL statements sent through `engine`; fail if more than `limit` were issued."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    if limit is not None and len(statements) > limit:
+        raise QueryBudgetExceeded(
+            f"{label}: {len(statements)} SQL statements, budget is {limit}:\n  " + "\n  ".join(statements)
+        )
+
+
+def seed_superadmin(Session, username: str = "bench_admin", permissions=ALL_PERMISSIONS) -> str:
+    """Create a superadmin whose role holds `permissions`; return a bearer token for it."""
+    db = Session()
+    try:
+        role = models.Role(name=models.UserRole.superadmin.value)
+        role.permissions = [models.Permission(name=name) for name in permissions]
+        db.add(role)
+        db.add(models.User(
+            username=username,
+            email=f"{username}@example.com",
+            password=DUMMY_HASH,
+            birthdate=date(1990, 1, 1),
+            role=models.UserRole.superadmin,
+        ))
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token(data={"sub": username})
+
+
+def seed_tasks(Session, count: int, group_count: int = 10):
+    db = Session()
+    try:
+        groups = [models.Group(name=f"group-{i}") for i in range(group_count)]
+        db.add_all(groups)
+        db.flush()
+        db.bulk_insert_mappings(models.Task, [
+            {
+                "title": f"task {i}",
+                "description": f"description for task {i}",
+                "assigned_group_id": groups[i % group_count].id,
+                "status": "pending",
+            }
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure_rps(client: TestClient, method: str, url: str, requests: int, **kwargs) -> float:
+    client.request(method, url, **kwargs)  # warm-up
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, response.text
+    return requests / (time.perf_counter() - start)
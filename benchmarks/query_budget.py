@@ -0,0 +1,152 @@
+"""Fail if an endpoint issues more SQL statements than its budget.
+
+    python -m benchmarks.query_budget
+
+Guards against N+1 regressions in response serialization and against
+re-reading rows after a write: budgets are fixed numbers, independent of
+how many groups/members the data has. Principal and permission caches are
+warmed first, so the counts cover the handler itself.
+"""
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.account import models
+from benchmarks.common import QueryBudgetExceeded, count_queries, make_app, seed_superadmin, seed_tasks
+
+# endpoint -> max SQL statements
+BUDGETS = {
+    "POST /account/register": 2,            # username check + INSERT
+    "POST /account/groups": 1,              # INSERT (the unique index rejects duplicates)
+    "POST /account/tasks": 2,               # INSERT task + INSERT its job
+    "PUT /account/tasks/{id}": 1,           # UPDATE ... RETURNING
+    "PUT /account/users/{id}/role": 2,      # SELECT + UPDATE
+    # independent of the number of items (100 / 10 here). Bulk create on
+    # SQLite: group check + first INSERT + executemany INSERT + jobs INSERT;
+    # on MySQL it is one INSERT per task (see bulk._insert_ids).
+    "POST /account/tasks/bulk": 4,
+    "PATCH /account/tasks/bulk": 4,
+    # nested responses: one IN query per level, however many groups/members
+    "GET /account/users/me": 3,             # user + its groups + their members
+    "GET /account/groups/{id}": 2,          # group + its members
+}
+
+
+def check_bulk_create(response, Session):
+    result = response.json()
+    assert result["succeeded"] == 100, result
+    ids = [item["id"] for item in result["results"]]
+    db = Session()
+    try:
+        titles = dict(db.query(models.Task.id, models.Task.title).filter(models.Task.id.in_(ids)))
+    finally:
+        db.close()
+    # each id belongs to the item at the same index
+    assert [titles[task_id] for task_id in ids] == [f"bulk {i}" for i in range(100)], "ids out of order"
+
+
+def check_bulk_patch(response, Session):
+    result = response.json()
+    assert result["succeeded"] == 10, result
+    db = Session()
+    try:
+        tasks = db.query(models.Task).filter(models.Task.id.in_(range(1, 11))).order_by(models.Task.id).all()
+    finally:
+        db.close()
+    for task in tasks:
+        assert task.assigned_group_id == (task.id + 1) % 5 + 1, "patched field not written"
+        # task 1 was renamed by PUT; the patch didn't send title, so it must survive
+        assert task.title == ("budget task renamed" if task.id == 1 else f"task {task.id - 1}"), "unsent field overwritten"
+
+def check_user_groups(response, Session):
+    groups = response.json()["groups"]
+    assert len(groups) == 5 and all(len(group["users"]) == 26 for group in groups), "nested groups incomplete"
+
+
+def check_group_members(response, Session):
+    assert len(response.json()["users"]) == 26, "group members incomplete"
+
+# endpoint -> check(response, Session) run after the budget passes
+CHECKS = {
+    "GET /account/users/me": check_user_groups,
+    "GET /account/groups/{id}": check_group_members,
+    "POST /account/tasks/bulk": check_bulk_create,
+    "PATCH /account/tasks/bulk": check_bulk_patch,
+}
+
+
+def seed_memberships(Session, members_per_group: int = 25, admin: str = "bench_admin"):
+    """Fill every group with members and put `admin` in all of them."""
+    db = Session()
+    try:
+        admin_user = db.query(models.User).filter(models.User.username == admin).one()
+        groups = db.query(models.Group).all()
+        for group in groups:
+            group.users = [admin_user] + [
+                models.User(username=f"{group.name}-member-{i}", email=f"{group.name}-{i}@example.com",
+                            password="x", role=models.UserRole.user)
+                for i in range(members_per_group)
+            ]
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    app, Session = make_app()
+    engine = Session.kw["bind"]
+    token = seed_superadmin(Session)
+    seed_tasks(Session, 10, group_count=5)
+    seed_memberships(Session)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/account/tasks", headers=headers)  # warm principal + permission caches
+
+    db = Session()
+    member_id = db.query(models.User.id).filter(models.User.role == models.UserRole.user).limit(1).scalar()
+    db.close()
+
+    calls = {
+        "POST /account/register": lambda: client.post("/account/register", json={
+            "username": "budget_user", "email": "budget_user@example.com",
+            "birthdate": "1990-01-01", "password": "budget-password",
+        }),
+        "POST /account/groups": lambda: client.post("/account/groups", json={"name": "budget-group"}, headers=headers),
+        "POST /account/tasks/bulk": lambda: client.post("/account/tasks/bulk", headers=headers, json=[
+            {"title": f"bulk {i}", "assigned_group_id": i % 5 + 1} for i in range(100)
+        ]),
+        "POST /account/tasks": lambda: client.post("/account/tasks", headers=headers, json={
+            "title": "budget task", "assigned_group_id": 1,
+        }),
+        "PUT /account/tasks/{id}": lambda: client.put("/account/tasks/1", headers=headers, json={
+            "title": "budget task renamed", "assigned_group_id": 2,
+        }),
+        "PUT /account/users/{id}/role": lambda: client.put(
+            f"/account/users/{member_id}/role?new_role=manager", headers=headers),
+        "GET /account/users/me": lambda: client.get("/account/users/me", headers=headers),
+        "GET /account/groups/{id}": lambda: client.get("/account/groups/1", headers=headers),
+        "PATCH /account/tasks/bulk": lambda: client.patch("/account/tasks/bulk", headers=headers, json=[
+            {"id": i, "assigned_group_id": (i + 1) % 5 + 1} for i in range(1, 11)
+        ]),
+    }
+
+    failed = False
+    for name, call in calls.items():
+        try:
+            with count_queries(engine, BUDGETS[name], label=name) as statements:
+                response = call()
+            assert response.status_code < 400, response.text
+            if name in CHECKS:
+                CHECKS[name](response, Session)
+            print(f"ok    {name}: {len(statements)}/{BUDGETS[name]} statements")
+        except QueryBudgetExceeded as exc:
+            failed = True
+            print(f"FAIL  {exc}")
+        except AssertionError as exc:
+            failed = True
+            print(f"FAIL  {name}: {exc}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""End-to-end benchmark suite for the account API.
+
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --out new.json --baseline bench.json
+
+Boots app.main against a throwaway SQLite file (DATABASE_URL is set
+before the app is imported), seeds users/groups/tasks/roles, then drives
+each endpoint with concurrent in-process requests (httpx over ASGI, no
+network). For every endpoint it reports throughput, p50/p95/p99 latency
+and SQL statements per request. JSON output is stable and diffable
+between commits; --baseline prints the relative change against an
+earlier run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def seed(SessionLocal, users: int, groups: int, tasks: int, password_hash: str):
+    from sqlalchemy import insert
+    from app.account import models
+    from benchmarks.common import ALL_PERMISSIONS, seed_superadmin
+
+    token = seed_superadmin(SessionLocal, permissions=ALL_PERMISSIONS)
+    db = SessionLocal()
+    try:
+        # a plain "user" role without permissions, like a real deployment
+        db.add(models.Role(name=models.UserRole.user.value))
+        db.execute(insert(models.Group), [{"id": i + 1, "name": f"group-{i}"} for i in range(groups)])
+        db.execute(insert(models.User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password": password_hash,
+             "birthdate": date(1990, 1, 1), "role": models.UserRole.user, "is_active": True}
+            for i in range(users)
+        ])
+        user_ids = [row[0] for row in db.query(models.User.id).filter(models.User.username.like("user%"))]
+        db.execute(insert(models.user_group_link), [
+            {"user_id": user_id, "group_id": i % groups + 1} for i, user_id in enumerate(user_ids)
+        ])
+        db.execute(insert(models.Task), [
+            {"title": f"task {i}", "description": f"description for task {i}",
+             "assigned_group_id": i % groups + 1, "status": ("pending", "done")[i % 2]}
+            for i in range(tasks)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return token
+
+
+async def drive(client, make_request, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def scenarios(token: str, tasks: int, groups: int):
+    auth = {"Authorization": f"Bearer {token}"}
+    return {
+        "POST /account/login": (0.05, lambda c, i: c.post(
+            "/account/login", data={"username": f"user{i}", "password": "bench-password"})),
+        "POST /account/register": (0.05, lambda c, i: c.post("/account/register", json={
+            "username": f"new{i}", "email": f"new{i}@example.com",
+            "birthdate": "1995-05-05", "password": "bench-password"})),
+        "GET /account/tasks": (1, lambda c, i: c.get("/account/tasks", headers=auth)),
+        "GET /account/tasks?after=": (1, lambda c, i: c.get(
+            f"/account/tasks?after={(i * 97) % tasks}&limit=100", headers=auth)),
+        "GET /account/tasks?assigned_group_id=": (1, lambda c, i: c.get(
+            f"/account/tasks?assigned_group_id={i % groups + 1}&status=pending", headers=auth)),
+        "POST /account/tasks": (0.5, lambda c, i: c.post("/account/tasks", headers=auth, json={
+            "title": f"bench task {i}", "description": "created by the suite", "assigned_group_id": i % groups + 1})),
+        "PUT /account/tasks/{id}": (0.5, lambda c, i: c.put(f"/account/tasks/{i % tasks + 1}", headers=auth, json={
+            "title": f"updated {i}", "description": "updated by the suite", "assigned_group_id": i % groups + 1})),
+        "POST /account/groups": (0.5, lambda c, i: c.post(
+            "/account/groups", headers=auth, json={"name": f"bench-group-{i}"})),
+    }
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    print(f"\n{'endpoint':40} {'rps':>9} {'p99':>9} {'sql/req':>9}   (change vs baseline)")
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        def delta(key):
+            return f"{(now[key] - before[key]) / before[key] * 100:+.0f}%" if before[key] else "n/a"
+        print(f"{name:40} {delta('rps'):>9} {delta('p99_ms'):>9} {delta('sql_per_request'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint (scaled per scenario)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--only", help="comma-separated endpoint names")
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # every request comes from one client address; measure the handlers, not the throttle
+    for limit in ("LOGIN_IP_RATE", "LOGIN_USER_RATE", "REGISTER_IP_RATE"):
+        os.environ.setdefault(limit, "0")
+
+    import httpx
+    from app.core.security import hash_password
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from benchmarks.common import count_queries
+
+    Base.metadata.create_all(bind=engine)
+    token = seed(SessionLocal, args.users, args.groups, args.tasks, hash_password("bench-password"))
+    results = {}
+    only = set(args.only.split(",")) if args.only else None
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, (scale, make_request) in scenarios(token, args.tasks, args.groups).items():
+                if only and name not in only:
+                    continue
+                requests = max(1, int(args.requests * scale))
+                await make_request(client, requests)  # warm caches/connections outside the measurement
+                with count_queries(engine) as statements:
+                    stats = await drive(client, make_request, requests, args.concurrency)
+                stats["sql_per_request"] = round(len(statements) / requests, 2)
+                results[name] = stats
+                print(f"{name:40} {stats['rps']:9.1f} req/s  p50 {stats['p50_ms']:8.2f}  "
+                      f"p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f} ms  "
+                      f"sql/req {stats['sql_per_request']:5.2f}  errors {stats['errors']}")
+
+    asyncio.run(run_all())
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    report = {
+        "meta": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "groups": args.groups,
+            "tasks": args.tasks,
+        },
+        "endpoints": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from app.database import SessionLocal
 from app.account import models
-from app.core.security import hash_password
+from app.core.hashing import password_hasher
 from datetime import date
 
 load_dotenv()
@@ -20,13 +20,12 @@ def create_superuser():
     admin = models.User(
         username=username,
         email=email,
-        password=hash_password(password),
+        password=password_hasher.hash_sync(password),
         birthdate=date.today(),
         role=models.UserRole.superadmin
     )
     db.add(admin)
     db.commit()
-    db.refresh(admin)
     print("Superuser created:", admin.username)
 
 if __name__ == "__main__":
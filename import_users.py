@@ -0,0 +1,29 @@
+import argparse
+import json
+
+from app.database import SessionLocal
+from app.account.bulk import BULK_IMPORT_CHUNK_SIZE, detect_format, import_users, parse_rows
+
+# python import_users.py users.csv
+# python import_users.py users.ndjson --chunk-size 2000
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or NDJSON")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=BULK_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8", newline="") as f:
+            result = import_users(db, parse_rows(f, args.format or detect_format(args.path)), chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    for error in result["errors"]:
+        print(json.dumps(error))
+    print(f"Created {result['created']} users, {result['failed']} rows failed")
+
+if __name__ == "__main__":
+    main()